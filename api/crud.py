@@ -0,0 +1,23 @@
+from typing import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from api.models import Slot, User
+
+
+def get_users_by_email(db: Session, emails: Iterable[str]) -> dict[str, User]:
+    """Fetch the users for all given emails in a single query, keyed by email."""
+    emails = list(dict.fromkeys(email for email in emails if email))
+    if not emails:
+        return {}
+    return {user.email: user for user in db.scalars(select(User).where(User.email.in_(emails)))}
+
+
+def ensure_slots(db: Session, slot_ids: Iterable[str]) -> None:
+    """Register any missing slots with one INSERT ... ON CONFLICT DO NOTHING."""
+    rows = [{"id": slot_id} for slot_id in dict.fromkeys(slot_ids) if slot_id]
+    if not rows:
+        return
+    db.execute(pg_insert(Slot).values(rows).on_conflict_do_nothing(index_elements=[Slot.id]))
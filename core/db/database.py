@@ -9,7 +9,7 @@ Strategy:
 import os
 import json
 import logging
-from typing import Optional, Set
+from typing import Iterable, Optional, Set
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -39,8 +39,23 @@ def _strip_db_lead_key(db_key: str, slot_id: Optional[str] = None) -> str:
         return key.split("::", 1)[1]
     return key.split("::", 1)[1]
 
+
+def _db_lead_keys(slot_id: str, lead_ids: Iterable[str]) -> list:
+    """Namespaced, de-duplicated keys for a batch of lead IDs (order kept)."""
+    keys = (_db_lead_key(slot_id, lid) for lid in lead_ids)
+    return list(dict.fromkeys(k for k in keys if k))
+
+
+def _chunks(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
 logger = logging.getLogger("leadforge.db")
 
+# Max IDs per IN (...) clause; stays under SQLite's legacy 999-parameter limit
+IN_CLAUSE_CHUNK = 900
+
 # Environment detection
 USE_POSTGRES = os.getenv("USE_POSTGRES", "false").lower() in ("true", "1", "yes")
 DATABASE_URL = os.getenv("DATABASE_URL", "").strip()
@@ -67,43 +82,60 @@ if USE_POSTGRES and DATABASE_URL:
     
     def save_lead_to_db(lead_data: dict, slot_id: str):
         """Save lead to Postgres with slot-namespaced key to avoid cross-slot collisions."""
+        if not _db_lead_key(slot_id, lead_data.get("lead_id") or lead_data.get("id")):
+            logger.error("Cannot save lead without ID")
+            return
+        save_leads_to_db([lead_data], slot_id)
+
+    def save_leads_to_db(leads: Iterable[dict], slot_id: str) -> int:
+        """
+        Save a batch of leads in one session/transaction (one SELECT for the
+        existing rows, one commit). Leads without an ID are skipped.
+        Returns the number of leads written.
+        """
+        rows = {}
+        for lead_data in leads:
+            db_lead_id = _db_lead_key(slot_id, lead_data.get("lead_id") or lead_data.get("id"))
+            if db_lead_id:
+                rows[db_lead_id] = lead_data
+        if not rows:
+            return 0
+
         session = SessionLocal()
         try:
-            raw_lead_id = lead_data.get("lead_id") or lead_data.get("id")
-            db_lead_id = _db_lead_key(slot_id, raw_lead_id)
-            if not db_lead_id:
-                logger.error("Cannot save lead without ID")
-                return
-            
-            existing = session.query(Lead).filter(Lead.lead_id == db_lead_id).first()
-            
-            if existing:
-                existing.title = lead_data.get("title")
-                existing.url = lead_data.get("url") or lead_data.get("detail_url")
-                existing.country = lead_data.get("country")
-                existing.status = lead_data.get("status", "captured")
-                existing.clicked_at = lead_data.get("clicked_at")
-                existing.verified_at = lead_data.get("verified_at")
-                existing.raw_data = lead_data
-            else:
-                new_lead = Lead(
-                    lead_id=db_lead_id,
-                    slot_id=slot_id,
-                    title=lead_data.get("title"),
-                    url=lead_data.get("url") or lead_data.get("detail_url"),
-                    country=lead_data.get("country"),
-                    status=lead_data.get("status", "captured"),
-                    fetched_at=lead_data.get("fetched_at"),
-                    clicked_at=lead_data.get("clicked_at"),
-                    verified_at=lead_data.get("verified_at"),
-                    raw_data=lead_data
-                )
-                session.add(new_lead)
-            
+            existing_rows = session.scalars(select(Lead).where(Lead.lead_id.in_(list(rows))))
+            existing_by_id = {lead.lead_id: lead for lead in existing_rows}
+
+            for db_lead_id, lead_data in rows.items():
+                existing = existing_by_id.get(db_lead_id)
+                if existing:
+                    existing.title = lead_data.get("title")
+                    existing.url = lead_data.get("url") or lead_data.get("detail_url")
+                    existing.country = lead_data.get("country")
+                    existing.status = lead_data.get("status", "captured")
+                    existing.clicked_at = lead_data.get("clicked_at")
+                    existing.verified_at = lead_data.get("verified_at")
+                    existing.raw_data = lead_data
+                else:
+                    new_lead = Lead(
+                        lead_id=db_lead_id,
+                        slot_id=slot_id,
+                        title=lead_data.get("title"),
+                        url=lead_data.get("url") or lead_data.get("detail_url"),
+                        country=lead_data.get("country"),
+                        status=lead_data.get("status", "captured"),
+                        fetched_at=lead_data.get("fetched_at"),
+                        clicked_at=lead_data.get("clicked_at"),
+                        verified_at=lead_data.get("verified_at"),
+                        raw_data=lead_data
+                    )
+                    session.add(new_lead)
+
             session.commit()
+            return len(rows)
         except Exception as e:
             session.rollback()
-            logger.error(f"Failed to save lead {lead_data.get('lead_id')}: {e}")
+            logger.error(f"Failed to save {len(rows)} leads: {e}")
             raise
         finally:
             session.close()
@@ -126,18 +158,20 @@ if USE_POSTGRES and DATABASE_URL:
         if not verified_ids:
             return
         
+        db_ids = _db_lead_keys(slot_id, verified_ids)
+        if not db_ids:
+            return
+
         verified_at_dt = verified_at or datetime.now(timezone.utc).isoformat()
         session = SessionLocal()
         try:
-            db_ids = [_db_lead_key(slot_id, lid) for lid in verified_ids if _db_lead_key(slot_id, lid)]
-            if not db_ids:
-                return
-            stmt = (
-                update(Lead)
-                .where(Lead.slot_id == slot_id, Lead.lead_id.in_(db_ids))
-                .values(status="verified", verified_at=verified_at_dt)
-            )
-            session.execute(stmt)
+            for chunk in _chunks(db_ids, IN_CLAUSE_CHUNK):
+                stmt = (
+                    update(Lead)
+                    .where(Lead.slot_id == slot_id, Lead.lead_id.in_(chunk))
+                    .values(status="verified", verified_at=verified_at_dt)
+                )
+                session.execute(stmt)
             session.commit()
         except Exception as e:
             session.rollback()
@@ -199,43 +233,58 @@ else:
         finally:
             conn.close()
     
+    UPSERT_LEAD_SQL = """
+        INSERT INTO leads (
+            lead_id, slot_id, title, url, country, status, 
+            fetched_at, clicked_at, verified_at, raw_data
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(lead_id) DO UPDATE SET
+            status=excluded.status,
+            clicked_at=excluded.clicked_at,
+            verified_at=excluded.verified_at,
+            raw_data=excluded.raw_data,
+            updated_at=CURRENT_TIMESTAMP
+    """
+
     def save_lead_to_db(lead_data: dict, slot_id: str):
         """Save lead to SQLite with slot-namespaced key to avoid cross-slot collisions."""
-        conn = get_connection()
-        try:
-            raw_lead_id = lead_data.get("lead_id") or lead_data.get("id")
-            db_lead_id = _db_lead_key(slot_id, raw_lead_id)
-            if not db_lead_id:
-                logger.error("Cannot save lead without ID")
-                return
+        if not _db_lead_key(slot_id, lead_data.get("lead_id") or lead_data.get("id")):
+            logger.error("Cannot save lead without ID")
+            return
+        save_leads_to_db([lead_data], slot_id)
 
-            title = lead_data.get("title")
-            url = lead_data.get("url") or lead_data.get("detail_url")
-            country = lead_data.get("country")
-            status = lead_data.get("status", "captured")
-            fetched_at = lead_data.get("fetched_at")
-            clicked_at = lead_data.get("clicked_at")
-            verified_at = lead_data.get("verified_at")
-            raw_json = json.dumps(lead_data)
+    def save_leads_to_db(leads: Iterable[dict], slot_id: str) -> int:
+        """
+        Save a batch of leads with one executemany in a single transaction.
+        Leads without an ID are skipped. Returns the number of leads written.
+        """
+        rows = []
+        for lead_data in leads:
+            db_lead_id = _db_lead_key(slot_id, lead_data.get("lead_id") or lead_data.get("id"))
+            if not db_lead_id:
+                continue
+            rows.append((
+                db_lead_id,
+                slot_id,
+                lead_data.get("title"),
+                lead_data.get("url") or lead_data.get("detail_url"),
+                lead_data.get("country"),
+                lead_data.get("status", "captured"),
+                lead_data.get("fetched_at"),
+                lead_data.get("clicked_at"),
+                lead_data.get("verified_at"),
+                json.dumps(lead_data),
+            ))
+        if not rows:
+            return 0
 
+        conn = get_connection()
+        try:
             with conn:
-                conn.execute("""
-                    INSERT INTO leads (
-                        lead_id, slot_id, title, url, country, status, 
-                        fetched_at, clicked_at, verified_at, raw_data
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ON CONFLICT(lead_id) DO UPDATE SET
-                        status=excluded.status,
-                        clicked_at=excluded.clicked_at,
-                        verified_at=excluded.verified_at,
-                        raw_data=excluded.raw_data,
-                        updated_at=CURRENT_TIMESTAMP
-                """, (
-                    db_lead_id, slot_id, title, url, country, status, 
-                    fetched_at, clicked_at, verified_at, raw_json
-                ))
+                conn.executemany(UPSERT_LEAD_SQL, rows)
+            return len(rows)
         except Exception as e:
-            logger.error(f"Failed to save lead {lead_data.get('lead_id')}: {e}")
+            logger.error(f"Failed to save {len(rows)} leads: {e}")
             raise
         finally:
             conn.close()
@@ -260,22 +309,22 @@ else:
         if not verified_ids:
             return
 
+        ids_list = _db_lead_keys(slot_id, verified_ids)
+        if not ids_list:
+            return
+
         verified_at = verified_at or datetime.now(timezone.utc).isoformat()
         conn = get_connection()
         try:
-            ids_list = [_db_lead_key(slot_id, lid) for lid in verified_ids if _db_lead_key(slot_id, lid)]
-            if not ids_list:
-                return
-            placeholders = ",".join("?" * len(ids_list))
-            
-            query = f"""
-                UPDATE leads 
-                SET status = 'verified', verified_at = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE slot_id = ? AND lead_id IN ({placeholders})
-            """
-            
-            conn.execute(query, [verified_at, slot_id] + ids_list)
-            conn.commit()
+            with conn:
+                for chunk in _chunks(ids_list, IN_CLAUSE_CHUNK):
+                    placeholders = ",".join("?" * len(chunk))
+                    query = f"""
+                        UPDATE leads 
+                        SET status = 'verified', verified_at = ?, updated_at = CURRENT_TIMESTAMP
+                        WHERE slot_id = ? AND lead_id IN ({placeholders})
+                    """
+                    conn.execute(query, [verified_at, slot_id] + chunk)
         except Exception as e:
             logger.error(f"Failed to mark leads verified: {e}")
         finally:
@@ -0,0 +1,19 @@
+"""
+JSON helpers shared by the provisioning scripts.
+
+orjson is an optional speedup and deliberately not in requirements.txt:
+when it is not installed, the stdlib json module produces the same output.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is used otherwise
+    orjson = None
+
+
+def dump_json(data) -> bytes:
+    """Serialize `data` as 2-space indented UTF-8 JSON bytes."""
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode("utf-8")
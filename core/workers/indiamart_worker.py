@@ -5,15 +5,73 @@ import sys
 import time
 from datetime import datetime, timezone
 from collections import deque
+from functools import lru_cache
+from itertools import chain
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import requests
 import yaml
+from requests.adapters import HTTPAdapter
 from requests.cookies import RequestsCookieJar
+from urllib3.util.retry import Retry
+
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as YamlLoader
 
 from core.workers.base_worker import BaseWorker
-from core.db.database import init_db, save_lead_to_db, get_slot_lead_ids, mark_leads_as_verified
+from core.db.database import (
+    init_db,
+    save_lead_to_db,
+    save_leads_to_db,
+    get_slot_lead_ids,
+    mark_leads_as_verified,
+)
+
+
+@lru_cache(maxsize=4096)
+def _parse_member_months_impl(text: str, now_year: int, now_month: int) -> int:
+    """
+    Pure 'member since' parser behind IndiaMartWorker._parse_member_months.
+    The current year/month are part of the cache key so entries never go stale.
+    """
+    # 1) Explicit month counts (e.g., "18 months")
+    # Accept "month", "months", "mon", "mons"
+    m = re.search(r"(\d+)\s*(?:months?|mons?)\b", text, re.IGNORECASE)
+    if m:
+        try:
+            return int(m.group(1))
+        except Exception:
+            pass
+
+    # 2) Strip common prefixes and punctuation for date parsing
+    cleaned = re.sub(r"member\s+since[:\s]*", "", text, flags=re.IGNORECASE)
+    cleaned = cleaned.replace("since", "").strip(" ,.-")
+
+    # 3) Try a handful of date formats (month/year granularity)
+    candidates = [
+        "%b %Y", "%B %Y", "%b-%Y", "%B-%Y",
+        "%Y-%m-%d", "%Y-%m", "%Y/%m/%d", "%Y/%m",
+        "%d-%b-%Y", "%d-%B-%Y",
+    ]
+    for fmt in candidates:
+        try:
+            dt = datetime.strptime(cleaned, fmt)
+            months = (now_year - dt.year) * 12 + (now_month - dt.month)
+            return max(months, 0)
+        except Exception:
+            continue
+
+    # 4) As a last resort, if the string is just a year
+    year_match = re.match(r"^(20\d{2}|19\d{2})$", cleaned)
+    if year_match:
+        year = int(year_match.group(1))
+        months = (now_year - year) * 12
+        return max(months, 0)
+
+    return 0
 
 
 class IndiaMartWorker(BaseWorker):
@@ -27,11 +85,31 @@ class IndiaMartWorker(BaseWorker):
     TICK_INTERVAL = 0.5  # 500ms - auto-corrected for stability (250ms caused crashes)
     REQUEST_TIMEOUT = (6, 14)  # (connect, read)
     MAX_RETRIES = 2
+    RETRY_BACKOFF = 0.5  # urllib3 backoff factor between retries
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    SEEN_KEYS_MAX = 50000  # reseed the in-memory dedupe set from the DB past this size
+    POOL_CONNECTIONS = 4  # distinct hosts kept warm (seller/www/api)
+    POOL_MAXSIZE = 20  # keep-alive connections per host
 
     BASE_DIR = Path(__file__).resolve().parents[2]
     DEFAULT_RECENT_URL = "https://seller.indiamart.com/bltxn/?pref=recent"
     DEFAULT_VERIFIED_URL = "https://seller.indiamart.com/blproduct/mypurchasedbl?disp=D"
     DEFAULT_RECENT_API_URL = "https://seller.indiamart.com/bltxn/default/BringFirstFoldOfBLOnRelevant/"
+    VERIFIED_CARD_SELECTOR = "div.ConLead_cont, .SLC_f20"
+    # True once one of the lead ids shows up in an id-bearing form (the same
+    # query params, paths and data-* attributes as ID_PATTERNS/DATA_ID_PATTERN)
+    # or one of the normalized titles shows up in the visible text. A bare id
+    # is never matched on its own: short ids collide with unrelated digits.
+    VERIFIED_LEAD_PRESENT_JS = r"""
+    ({ids, titles}) => {
+      const html = document.documentElement ? document.documentElement.innerHTML : '';
+      const text = ((document.body && document.body.innerText) || '').replace(/\s+/g, ' ').toLowerCase();
+      const prefix = /(?:(?:blid|bl_id|rfq_id|leadid|lead_id|enqid|enquiryid|inquiryid)=|\/(?:bl|lead)\/|data-[a-z0-9_-]*(?:bl|lead|rfq|enq)[a-z0-9_-]*=["']?)/.source;
+      const escape = (s) => s.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+      return ids.some((id) => new RegExp(prefix + escape(id) + '(?![0-9a-z])', 'i').test(html))
+        || titles.some((t) => text.includes(t));
+    }
+    """
 
     ID_PATTERNS = [
         re.compile(r"blid=([0-9]+)", re.IGNORECASE),
@@ -55,14 +133,37 @@ class IndiaMartWorker(BaseWorker):
     PHONE_PATTERN = re.compile(r"\+(\d[\d\-\s]{7,15}\d)", re.IGNORECASE)
     EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+", re.IGNORECASE)
 
+    # Login probe markers, matched case-insensitively without lowercasing the page
+    LOGIN_IN_PATTERN = re.compile(
+        "|".join(map(re.escape, ["bl_listing", "contact buyer now", "past transactions", "buyleads"])),
+        re.IGNORECASE,
+    )
+    LOGIN_OUT_PATTERN = re.compile(
+        "|".join(map(re.escape, ["free registration", "start selling", "sell on indiamart", "sign in"])),
+        re.IGNORECASE,
+    )
+
+    # `<a\s` keeps the scan from wandering into <abbr>, <article>, <aside>, ...
     ANCHOR_PATTERN = re.compile(
-        r"<a[^>]+href=[\"']([^\"']+)[\"'][^>]*>(.*?)</a>",
+        r"<a\s[^>]*href=[\"']([^\"']+)[\"'][^>]*>(.*?)</a>",
         re.IGNORECASE | re.DOTALL,
     )
 
+    TAG_PATTERN = re.compile(r"<[^>]+>")
+    DOUBLE_DOMAIN_PREFIX_PATTERN = re.compile(r"^(https?:)?//seller\.indiamart\.com//")
+    DOUBLE_DOMAIN_INNER_PATTERN = re.compile(r"(https?://seller\.indiamart\.com)/+seller\.indiamart\.com/")
+
+    COUNTRY_SPLIT_PATTERN = re.compile(r"\W+")
+
+    LEAD_LINK_TOKENS = ("bltxn", "lead", "blproduct", "enq", "rfq", "blid")
+
+    # Byte table mapping everything except [a-z0-9] to a space (title matching)
+    TITLE_NORM_TABLE = bytes(c if (48 <= c <= 57 or 97 <= c <= 122) else 32 for c in range(256))
+
     def __init__(self, slot_dir: Path):
         super().__init__(slot_dir)
 
+        self._cfg_cache: Optional[Tuple[Tuple[int, int], dict]] = None
         self.config = self._load_config()
         self.session = self._build_session()
         self._playwright = None
@@ -74,6 +175,17 @@ class IndiaMartWorker(BaseWorker):
         self._recent_ready = False
         self._last_recent_nav = 0.0
         self._recent_frame = None
+        self._verified_phone_tails: set = set()
+        self._verified_emails: set = set()
+        self._seen_keys: Optional[set] = None
+        self._now_iso_cache: Tuple[int, str] = (0, "")
+        # Top-level slot_state.json updates staged during a tick, written once by _flush_state
+        self._state_pending: Dict[str, object] = {}
+        try:
+            self._last_top_lead_id = self.load_state().get("last_top_lead_id")
+        except Exception:
+            self._last_top_lead_id = None
+        self._terms_pattern_cache: Dict[Tuple[str, ...], re.Pattern] = {}
 
         self.state = {
             "phase": "INIT",
@@ -129,18 +241,46 @@ class IndiaMartWorker(BaseWorker):
             "debug_snapshot": False,
         }
 
-        if not cfg_file.exists() or cfg_file.stat().st_size == 0:
-            return defaults
+        try:
+            st = cfg_file.stat()
+        except OSError:
+            return self._with_filter_terms(defaults)
+        if st.st_size == 0:
+            return self._with_filter_terms(defaults)
+
+        # tick() reloads config every iteration; only re-parse when the file changed
+        signature = (st.st_mtime_ns, st.st_size)
+        if self._cfg_cache and self._cfg_cache[0] == signature:
+            return self._cfg_cache[1]
 
         try:
-            data = yaml.safe_load(cfg_file.read_text()) or {}
+            data = yaml.load(cfg_file.read_text(), Loader=YamlLoader) or {}
             if not isinstance(data, dict):
-                return defaults
+                return self._with_filter_terms(defaults)
             cfg = defaults.copy()
             cfg.update({k: v for k, v in data.items() if v is not None})
-            return cfg
+            cfg = self._with_filter_terms(cfg)
         except Exception:
-            return defaults
+            return self._with_filter_terms(defaults)
+
+        self._cfg_cache = (signature, cfg)
+        return cfg
+
+    def _with_filter_terms(self, cfg: dict) -> dict:
+        """
+        Attach lowercased, stripped copies of the keyword/country filters so the
+        per-lead filter loop doesn't renormalize them on every tick.
+        """
+        def _clean(values) -> Tuple[str, ...]:
+            return tuple(str(v).lower().strip() for v in (values or []) if str(v).strip())
+
+        countries = _clean(cfg.get("country"))
+        cfg["_search_terms_lc"] = _clean(cfg.get("search_terms"))
+        cfg["_exclude_terms_lc"] = _clean(cfg.get("exclude_terms"))
+        cfg["_countries_lc"] = countries
+        cfg["_country_codes"] = frozenset(c for c in countries if len(c) <= 3)
+        cfg["_country_names"] = tuple(c for c in countries if len(c) > 3)
+        return cfg
 
     def _load_cookies(self) -> Dict[str, str]:
         cookie_path = self.slot_dir / "session.enc"
@@ -175,6 +315,21 @@ class IndiaMartWorker(BaseWorker):
 
     def _build_session(self) -> requests.Session:
         session = requests.Session()
+        # Reuse warm keep-alive connections across click/purchase GETs;
+        # transient failures are retried with backoff by urllib3.
+        retry = Retry(
+            total=self.MAX_RETRIES,
+            backoff_factor=self.RETRY_BACKOFF,
+            status_forcelist=self.RETRY_STATUSES,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.POOL_CONNECTIONS,
+            pool_maxsize=self.POOL_MAXSIZE,
+            max_retries=retry,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
         session.headers.update({
             "User-Agent": (
                 "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
@@ -183,6 +338,8 @@ class IndiaMartWorker(BaseWorker):
             ),
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
             "Accept-Language": "en-US,en;q=0.9",
+            # br is left out: brotli is not a dependency, so urllib3 could not decode it
+            "Accept-Encoding": "gzip, deflate",
             "Referer": "https://seller.indiamart.com/",
         })
 
@@ -270,21 +427,57 @@ class IndiaMartWorker(BaseWorker):
 
     # ---------- Helpers ---------- #
 
+    def _now_iso(self) -> str:
+        # UTC "YYYY-MM-DDTHH:MM:SSZ"; strftime only re-runs when the second changes
+        now = int(time.time())
+        if now != self._now_iso_cache[0]:
+            self._now_iso_cache = (now, time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now)))
+        return self._now_iso_cache[1]
+
+    def _stage_state(self, **updates):
+        self._state_pending.update(updates)
+
+    def _flush_state(self):
+        """
+        Apply staged top-level updates in one read-modify-write. The file is
+        re-read here because the API and slot manager also write it.
+        """
+        if not self._state_pending:
+            return
+        pending, self._state_pending = self._state_pending, {}
+        try:
+            state = self.load_state()
+            state.update(pending)
+            self.write_state(state)
+        except Exception:
+            pass
+
     def _record_action(self, action: str, phase: str, **metrics):
         self.state["last_action"] = action
         self.update_metrics(last_action=action, phase=phase, **metrics)
 
     def _strip_tags(self, text: str) -> str:
-        cleaned = re.sub(r"<[^>]+>", " ", text or "")
-        return " ".join(cleaned.replace("\n", " ").split()).strip()
+        # str.split() already collapses newlines and trims the ends
+        return " ".join(self.TAG_PATTERN.sub(" ", text or "").split())
+
+    def _normalize_title(self, title: str) -> str:
+        # Equivalent to re.sub(r"[^a-z0-9]+", " ", title.lower()).strip();
+        # non-ASCII characters become "?" and are blanked by the table.
+        raw = str(title or "").lower().encode("ascii", "replace")
+        return " ".join(raw.translate(self.TITLE_NORM_TABLE).decode("ascii").split())
+
+    def _phone_tail(self, phone: str) -> str:
+        # Last 10 digits of a phone number, or "" if it has fewer digits
+        digits = "".join(c for c in str(phone or "") if c.isdigit())
+        return digits[-10:] if len(digits) >= 10 else ""
 
     def _normalize_url(self, url: str) -> str:
         if not url:
             return ""
         # Clean double-domain bug: //seller.indiamart.com//seller.indiamart.com/...
-        url = re.sub(r"^(https?:)?//seller\.indiamart\.com//", "https://seller.indiamart.com/", url)
+        url = self.DOUBLE_DOMAIN_PREFIX_PATTERN.sub("https://seller.indiamart.com/", url)
         # Also handle case where it appears mid-URL
-        url = re.sub(r"(https?://seller\.indiamart\.com)/+seller\.indiamart\.com/", r"\1/", url)
+        url = self.DOUBLE_DOMAIN_INNER_PATTERN.sub(r"\1/", url)
         if url.startswith("//"):
             return f"https:{url}"
         if url.startswith("http"):
@@ -319,11 +512,25 @@ class IndiaMartWorker(BaseWorker):
 
         return found
 
+    def _terms_pattern(self, terms: Tuple[str, ...]) -> Optional[re.Pattern]:
+        """
+        Compile keyword terms into one alternation so each title is scanned
+        once for all terms. Cached per distinct term list.
+        """
+        if not terms:
+            return None
+        key = tuple(terms)
+        pattern = self._terms_pattern_cache.get(key)
+        if pattern is None:
+            pattern = re.compile("|".join(map(re.escape, dict.fromkeys(terms))))
+            self._terms_pattern_cache[key] = pattern
+        return pattern
+
     def _looks_like_lead_link(self, href: str) -> bool:
         if not href:
             return False
         token = href.lower()
-        return any(k in token for k in ("bltxn", "lead", "blproduct", "enq", "rfq", "blid"))
+        return any(k in token for k in self.LEAD_LINK_TOKENS)
 
     def _lead_key(self, lead: Dict[str, str]) -> str:
         lead_id = str(lead.get("lead_id") or "").strip()
@@ -335,7 +542,10 @@ class IndiaMartWorker(BaseWorker):
         title = str(lead.get("title") or lead.get("company") or "").strip().lower()
         if title:
             return f"title:{title}"
-        digest = hashlib.sha1(json.dumps(lead, sort_keys=True).encode("utf-8")).hexdigest()
+        # Non-cryptographic use: a short blake2b digest is plenty for dedupe
+        digest = hashlib.blake2b(
+            json.dumps(lead, sort_keys=True).encode("utf-8"), digest_size=8
+        ).hexdigest()
         return f"hash:{digest}"
 
     def _load_existing_keys(self, max_lines: int = 5000) -> set:
@@ -350,6 +560,15 @@ class IndiaMartWorker(BaseWorker):
         except Exception:
             return set()
 
+    def _get_seen_keys(self) -> set:
+        """
+        In-memory dedupe set, seeded from the DB once and then kept current by
+        _persist_leads, so PARSE_RECENT doesn't re-query the DB every cycle.
+        """
+        if self._seen_keys is None:
+            self._seen_keys = self._load_existing_keys()
+        return self._seen_keys
+
     def _snapshot_html(self, name: str, html: str):
         if not self.config.get("debug_snapshot"):
             return
@@ -405,45 +624,8 @@ class IndiaMartWorker(BaseWorker):
         text = str(value).strip()
         if not text:
             return 0
-
-        # 1) Explicit month counts (e.g., "18 months")
-        # Accept "month", "months", "mon", "mons"
-        m = re.search(r"(\d+)\s*(?:months?|mons?)\b", text, re.IGNORECASE)
-        if m:
-            try:
-                return int(m.group(1))
-            except Exception:
-                pass
-
-        # 2) Strip common prefixes and punctuation for date parsing
-        cleaned = re.sub(r"member\\s+since[:\\s]*", "", text, flags=re.IGNORECASE)
-        cleaned = cleaned.replace("since", "").strip(" ,.-")
-
-        # 3) Try a handful of date formats (month/year granularity)
-        candidates = [
-            "%b %Y", "%B %Y", "%b-%Y", "%B-%Y",
-            "%Y-%m-%d", "%Y-%m", "%Y/%m/%d", "%Y/%m",
-            "%d-%b-%Y", "%d-%B-%Y",
-        ]
-        for fmt in candidates:
-            try:
-                dt = datetime.strptime(cleaned, fmt)
-                dt = dt.replace(tzinfo=timezone.utc)
-                now = datetime.now(timezone.utc)
-                months = (now.year - dt.year) * 12 + (now.month - dt.month)
-                return max(months, 0)
-            except Exception:
-                continue
-
-        # 4) As a last resort, if the string is just a year
-        year_match = re.match(r"^(20\\d{2}|19\\d{2})$", cleaned)
-        if year_match:
-            year = int(year_match.group(1))
-            now = datetime.now(timezone.utc)
-            months = (now.year - year) * 12
-            return max(months, 0)
-
-        return 0
+        now = datetime.now(timezone.utc)
+        return _parse_member_months_impl(text, now.year, now.month)
 
     def _extract_urls_from_item(self, item: dict) -> Tuple[Optional[str], Optional[str]]:
         if not isinstance(item, dict):
@@ -725,7 +907,20 @@ class IndiaMartWorker(BaseWorker):
         self._record_recent_missing()
         return False
 
-    def _fetch_verified_html(self, wait_ms: Optional[int] = None) -> Optional[str]:
+    def _fetch_verified_html(
+        self,
+        wait_ms: Optional[int] = None,
+        expect: Optional[Dict[str, List[str]]] = None,
+        expect_wait_ms: int = 0,
+    ) -> Optional[str]:
+        """
+        Load the purchased-leads page once. With `expect` ({"ids": [...],
+        "titles": [...]}), wait (up to expect_wait_ms + wait_ms) until one of
+        those ids or titles is on the page, i.e. until the just-clicked lead
+        has rendered; otherwise wait for any
+        purchased-lead card. Without a browser the page is fetched after
+        sleeping expect_wait_ms, since a plain GET cannot be watched.
+        """
         url = self.config.get("verified_url") or self.DEFAULT_VERIFIED_URL
         html = None
         if self.config.get("use_browser", True) and self._ensure_browser():
@@ -734,8 +929,19 @@ class IndiaMartWorker(BaseWorker):
                 page = self._context.new_page()
                 page.goto(url, wait_until="domcontentloaded")
                 delay_ms = int(wait_ms if wait_ms is not None else (self.config.get("verify_render_wait_ms") or 0))
-                if delay_ms > 0:
-                    page.wait_for_timeout(delay_ms)
+                try:
+                    if expect and delay_ms + expect_wait_ms > 0:
+                        page.wait_for_function(
+                            self.VERIFIED_LEAD_PRESENT_JS,
+                            arg=expect,
+                            timeout=delay_ms + expect_wait_ms,
+                            polling=500,
+                        )
+                    elif delay_ms > 0:
+                        # Return as soon as purchased-lead cards render instead of a fixed wait
+                        page.wait_for_selector(self.VERIFIED_CARD_SELECTOR, timeout=delay_ms)
+                except Exception:
+                    pass
                 html = page.content()
             except Exception as exc:
                 self.record_error(f"verify_tab_{str(exc)[:50]}")
@@ -746,6 +952,8 @@ class IndiaMartWorker(BaseWorker):
                     except Exception:
                         pass
         else:
+            if expect_wait_ms > 0:
+                time.sleep(expect_wait_ms / 1000)
             html = self._fetch_page(url)
         return html
 
@@ -847,13 +1055,15 @@ class IndiaMartWorker(BaseWorker):
         max_age = self.config.get("max_lead_age_seconds")
         # 0 or None means "no limit" - use 24 hours as effective max
         max_age = int(max_age) if max_age else 86400
-        search_terms = [t.lower().strip() for t in (self.config.get("search_terms") or []) if t.strip()]
-        exclude_terms = [t.lower().strip() for t in (self.config.get("exclude_terms") or []) if t.strip()]
+        search_re = self._terms_pattern(self.config["_search_terms_lc"])
+        exclude_re = self._terms_pattern(self.config["_exclude_terms_lc"])
         min_member_months = int(self.config.get("min_member_months") or 0)
         max_age_hours = int(self.config.get("max_age_hours") or 0)
 
         raw_countries = (self.config.get("country") or []) + (self.config.get("client_regions") or [])
-        allowed_countries = set(c.lower() for c in raw_countries)
+        # Normalized once per batch rather than per lead x country
+        normalized = (str(c).strip().lower() for c in raw_countries)
+        allowed_countries = tuple(dict.fromkeys(c for c in normalized if c))
 
         leads: List[Dict[str, str]] = []
         for item in items:
@@ -901,13 +1111,9 @@ class IndiaMartWorker(BaseWorker):
             if allowed_countries:
                 if msg_country:
                     match_found = False
-                    country_tokens = set(re.split(r"\W+", msg_country))
+                    country_tokens = set(self.COUNTRY_SPLIT_PATTERN.split(msg_country))
 
                     for allowed in allowed_countries:
-                        allowed = allowed.strip().lower()
-                        if not allowed:
-                            continue
-
                         if msg_country_code and allowed == msg_country_code:
                             match_found = True
                             break
@@ -934,9 +1140,9 @@ class IndiaMartWorker(BaseWorker):
                 buy_url = detail_url
 
             title_lower = title.lower()
-            if exclude_terms and any(ex in title_lower for ex in exclude_terms):
+            if exclude_re and exclude_re.search(title_lower):
                 continue
-            if search_terms and not any(term in title_lower for term in search_terms):
+            if search_re and not search_re.search(title_lower):
                 continue
 
             # Quality filters
@@ -1390,22 +1596,22 @@ class IndiaMartWorker(BaseWorker):
             return []
 
     def _fetch_page(self, url: str) -> Optional[str]:
-        last_error = None
-        for attempt in range(1, self.MAX_RETRIES + 1):
-            try:
-                resp = self.session.get(url, timeout=self.REQUEST_TIMEOUT)
-                if resp.status_code == 200:
-                    self.update_metrics(last_error=None)
-                    return resp.text
-                last_error = f"HTTP {resp.status_code}"
-            except requests.RequestException as exc:
-                last_error = str(exc)
-
-            time.sleep(min(2 * attempt, 6))
+        # Retries/backoff are handled by the session adapter (see _build_session)
+        try:
+            resp = self.session.get(url, timeout=self.REQUEST_TIMEOUT)
+        except requests.RequestException as exc:
+            self.record_error(str(exc)[:200])
+            return None
+        if resp.status_code != 200:
+            self.record_error(f"HTTP {resp.status_code}")
+            return None
+        self.update_metrics(last_error=None)
+        return self._decode_html(resp)
 
-        if last_error:
-            self.record_error(last_error[:200])
-        return None
+    @staticmethod
+    def _decode_html(resp: requests.Response) -> str:
+        # IndiaMart serves UTF-8; skip requests' charset detection on every page
+        return resp.content.decode("utf-8", errors="replace")
 
     def _parse_recent_leads(self, html: str) -> List[Dict[str, str]]:
         leads = []
@@ -1461,7 +1667,8 @@ class IndiaMartWorker(BaseWorker):
         
         Returns: (verified_ids, verified_contacts, verified_titles)
         - verified_ids: set of lead IDs (if found via patterns)
-        - verified_contacts: set of (phone, email) tuples from purchased leads
+        - verified_contacts: buyer phones/emails, kept on self._verified_phone_tails /
+          self._verified_emails rather than returned
         - verified_titles: set of purchased lead titles (fallback match)
         
         Strategy: Past Transactions page is a React SPA that doesn't expose
@@ -1471,19 +1678,20 @@ class IndiaMartWorker(BaseWorker):
         ids = set(self._extract_ids(html or ""))
         
         # Also extract phone/email from ConLead_cont cards for matching
-        verified_contacts = set()
+        verified_phones = set()
+        verified_emails = set()
         
         # Parse ConLead_cont sections for buyer details
         # Pattern: each card contains Mobile: xxx and Email: xxx
         for phone_match in self.PHONE_PATTERN.finditer(html or ""):
             phone = phone_match.group(0).strip()
             if phone and len(phone) > 8:
-                verified_contacts.add(("phone", phone))
+                verified_phones.add(phone)
         
         for email_match in self.EMAIL_PATTERN.finditer(html or ""):
             email = email_match.group(0).strip().lower()
             if email and "@" in email and "." in email:
-                verified_contacts.add(("email", email))
+                verified_emails.add(email)
 
         # Extract titles from purchased lead cards
         verified_titles = set()
@@ -1500,11 +1708,13 @@ class IndiaMartWorker(BaseWorker):
                 continue
             urls.add(self._normalize_url(href))
         
-        # Store contacts for later matching
-        self.state["verified_contacts"] = list(verified_contacts)
+        # Keep contacts on the worker for _apply_verification
+        self._verified_phone_tails = {t for t in map(self._phone_tail, verified_phones) if t}
+        self._verified_emails = verified_emails
         self.state["verified_titles"] = list(verified_titles)
         
-        print(f"[WORKER] Verification parsed: {len(ids)} IDs, {len(verified_contacts)} contacts, {len(verified_titles)} titles")
+        contact_count = len(verified_phones) + len(verified_emails)
+        print(f"[WORKER] Verification parsed: {len(ids)} IDs, {contact_count} contacts, {len(verified_titles)} titles")
         
         return ids, urls, verified_titles
 
@@ -1518,6 +1728,7 @@ class IndiaMartWorker(BaseWorker):
             return 0
 
         clicks = 0
+        now = self._now_iso()
         for lead in leads:
             if clicks >= max_clicks:
                 break
@@ -1528,7 +1739,7 @@ class IndiaMartWorker(BaseWorker):
                 resp = self.session.get(url, timeout=self.REQUEST_TIMEOUT)
                 if resp.status_code == 200:
                     lead["status"] = "clicked"
-                    lead["clicked_at"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+                    lead["clicked_at"] = now
                     clicks += 1
                 else:
                     self.record_error(f"click_http_{resp.status_code}")
@@ -1548,6 +1759,7 @@ class IndiaMartWorker(BaseWorker):
 
         clicks = 0
         allow_detail = bool(self.config.get("allow_detail_click", False))
+        now = self._now_iso()
         for lead in leads:
             if lead.get("status") == "rejected":
                 continue
@@ -1562,7 +1774,7 @@ class IndiaMartWorker(BaseWorker):
                 resp = self.session.get(target, timeout=self.REQUEST_TIMEOUT)
                 if resp.status_code == 200:
                     lead["status"] = "clicked"
-                    lead["clicked_at"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+                    lead["clicked_at"] = now
                     lead["buy_attempt_url"] = target
                     lead["buy_attempt_status"] = resp.status_code
                     clicks += 1
@@ -1730,7 +1942,7 @@ class IndiaMartWorker(BaseWorker):
                 missed_ids = result.get("missed") or []
             
             # Mark leads as clicked
-            now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+            now = self._now_iso()
             for lead in leads:
                 if lead.get("lead_id") in clicked_ids:
                     lead["status"] = "clicked"
@@ -1755,17 +1967,26 @@ class IndiaMartWorker(BaseWorker):
         verify_delay = int(self.config.get("verify_after_click_seconds") or 0)
         verify_wait_ms = int(self.config.get("verify_render_wait_ms") or 0)
         verified_total = set()
+        leads_by_id = {str(l.get("lead_id") or "").strip(): l for l in leads}
 
         for lead_id in clicked_ids:
-            if verify_delay > 0:
-                time.sleep(verify_delay)
-            html = self._fetch_verified_html(wait_ms=verify_wait_ms)
+            # One page load per click: it returns as soon as this lead (by id
+            # or title) is rendered, waiting at most verify_delay + render wait
+            # instead of always sleeping the full delay first.
+            lead = leads_by_id.get(str(lead_id).strip()) or {}
+            title = " ".join(str(lead.get("title") or "").split()).lower()
+            lead_key = str(lead_id).strip()
+            html = self._fetch_verified_html(
+                wait_ms=verify_wait_ms,
+                expect={"ids": [lead_key] if lead_key else [], "titles": [title] if title else []},
+                expect_wait_ms=verify_delay * 1000,
+            )
             if not html:
                 continue
             if not self._page_logged_in(html):
                 self.record_error("login_required")
                 self._refresh_cookies_from_browser()
-            verified_ids, verified_urls, verified_titles = self._parse_verified(html or "")
+            verified_ids, verified_urls, verified_titles = self._parse_verified(html)
             newly_verified = self._apply_verification(
                 leads,
                 verified_ids,
@@ -1799,31 +2020,38 @@ class IndiaMartWorker(BaseWorker):
         if not leads:
             return set()
         
-        # Get verified contacts from state (set by _parse_verified)
-        verified_contacts = set(tuple(c) for c in self.state.get("verified_contacts", []))
-        verified_phones = {c[1] for c in verified_contacts if c[0] == "phone"}
-        verified_emails = {c[1].lower() for c in verified_contacts if c[0] == "email"}
+        # Verified contacts are set by _parse_verified
+        verified_phone_tails = self._verified_phone_tails
+        verified_emails = self._verified_emails
         verified_titles_norm = set()
         if verified_titles:
             for title in verified_titles:
-                normalized = re.sub(r"[^a-z0-9]+", " ", str(title).lower()).strip()
+                normalized = self._normalize_title(title)
                 if normalized:
                     verified_titles_norm.add(normalized)
         
+        # Precompute which fallback strategies can possibly match
+        have_phones = bool(verified_phone_tails)
+        have_emails = bool(verified_emails)
+        have_titles = bool(verified_titles_norm)
+
         verified_count = 0
         verified_lead_ids = set()
-        
-        for lead in leads:
+        now = self._now_iso()
+
+        # Only inspect the just-clicked leads when a subset is requested
+        if only_lead_ids:
+            leads_by_id = {str(l.get("lead_id") or "").strip(): l for l in leads}
+            targets = [leads_by_id[i] for i in only_lead_ids if i in leads_by_id]
+        else:
+            targets = leads
+
+        for lead in targets:
             lead_id = str(lead.get("lead_id") or "").strip()
-            if only_lead_ids and lead_id not in only_lead_ids:
-                continue
             url = str(lead.get("detail_url") or lead.get("url") or "").strip()
             
             # Get lead's contact info
             lead_phone = str(lead.get("mobile") or lead.get("phone") or "").strip()
-            lead_email = str(lead.get("email") or "").strip().lower()
-            lead_title = str(lead.get("title") or "").strip().lower()
-            lead_title_norm = re.sub(r"[^a-z0-9]+", " ", lead_title).strip()
             
             is_verified = False
             
@@ -1837,21 +2065,17 @@ class IndiaMartWorker(BaseWorker):
             
             # Strategy 3: Match by phone (10-digit match for accuracy)
             elif lead_phone and len(lead_phone) > 6:
-                for vp in verified_phones:
-                    # Strip all non-digits and compare last 10 digits
-                    clean_lead = ''.join(c for c in lead_phone if c.isdigit())
-                    clean_verified = ''.join(c for c in vp if c.isdigit())
-                    if len(clean_lead) >= 10 and len(clean_verified) >= 10:
-                        if clean_lead[-10:] == clean_verified[-10:]:
-                            is_verified = True
-                            break
+                # Compare last 10 digits against the precomputed verified tails
+                if have_phones and self._phone_tail(lead_phone) in verified_phone_tails:
+                    is_verified = True
             
             # Strategy 4: Match by email
-            elif lead_email and lead_email in verified_emails:
+            elif have_emails and str(lead.get("email") or "").strip().lower() in verified_emails:
                 is_verified = True
             
             # Strategy 5: Match by title (fallback)
-            elif lead_title_norm and verified_titles_norm:
+            elif have_titles:
+                lead_title_norm = self._normalize_title(lead.get("title") or "")
                 for vt in verified_titles_norm:
                     if lead_title_norm == vt:
                         is_verified = True
@@ -1862,7 +2086,7 @@ class IndiaMartWorker(BaseWorker):
             
             if is_verified:
                 lead["status"] = "verified"
-                lead["verified_at"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+                lead["verified_at"] = now
                 verified_count += 1
                 if lead_id:
                     verified_lead_ids.add(lead_id)
@@ -1871,41 +2095,51 @@ class IndiaMartWorker(BaseWorker):
             print(f"[WORKER] Verified {verified_count} leads via matching")
         return verified_lead_ids
 
-    def _persist_leads(self, leads: List[Dict[str, str]]):
-        if not leads:
-            return
-
-        now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    def _persist_leads(self, leads: Iterable[Dict[str, str]]):
+        now = self._now_iso()
         
-        saved_count = 0
-        # Save to SQLite
-        for lead in leads:
-            lead_key = self._lead_key(lead)
-            # Skip leads without ID to avoid primary key constraint errors
-            if not lead.get("lead_id"):
-                 continue
-
-            payload = {
+        # Skip leads without ID to avoid primary key constraint errors
+        payloads = [
+            {
                 **lead,
-                "lead_key": lead_key,
+                "lead_key": self._lead_key(lead),
                 "slot_id": self.slot_dir.name,
                 "fetched_at": lead.get("fetched_at") or now,
             }
-            try:
-                save_lead_to_db(payload, self.slot_dir.name)
-                saved_count += 1
-            except Exception as e:
-                self.record_error(f"db_save_err: {e}")
+            for lead in leads
+            if lead.get("lead_id")
+        ]
+        if not payloads:
+            return
+
+        # Save the whole batch in one transaction; fall back to per-lead saves
+        # so a single bad record doesn't drop the rest of the batch.
+        saved_count = 0
+        saved_keys = []
+        try:
+            saved_count = save_leads_to_db(payloads, self.slot_dir.name)
+            saved_keys = [p["lead_key"] for p in payloads]
+        except Exception as e:
+            self.record_error(f"db_save_err: {e}")
+            for payload in payloads:
+                try:
+                    save_lead_to_db(payload, self.slot_dir.name)
+                    saved_count += 1
+                    saved_keys.append(payload["lead_key"])
+                except Exception as e:
+                    self.record_error(f"db_save_err: {e}")
+
+        # Only leads that reached the DB count as seen; failed ones must be
+        # retried on a later tick rather than skipped as duplicates.
+        if saved_keys and self._seen_keys is not None:
+            self._seen_keys.update(saved_keys)
+            if len(self._seen_keys) > self.SEEN_KEYS_MAX:
+                self._seen_keys = None
 
         # Keep DB persistence separate from "leads_parsed" metrics.
         # "leads_parsed" is updated in _parse_recent_phase based on unique, qualifying leads.
         if saved_count:
-            try:
-                state = self.load_state()
-                state["updated_at"] = now
-                self.write_state(state)
-            except Exception:
-                pass
+            self._stage_state(updated_at=now)
 
     # ---------- Phase handlers ---------- #
 
@@ -1938,10 +2172,10 @@ class IndiaMartWorker(BaseWorker):
         # Quick login probe to update slot_state for UI
         try:
             status = self._probe_login_status()
-            state = self.load_state()
-            state["login_status"] = status.get("status")
-            state["login_checked_at"] = status.get("checked_at")
-            self.write_state(state)
+            self._stage_state(
+                login_status=status.get("status"),
+                login_checked_at=status.get("checked_at"),
+            )
         except Exception:
             pass
 
@@ -1952,11 +2186,9 @@ class IndiaMartWorker(BaseWorker):
             resp = session.get(url, timeout=(4, 10))
         except Exception as exc:
             return {"status": "unknown", "reason": str(exc)[:80], "checked_at": None}
-        html = (resp.text or "").lower()
-        markers_in = ["bl_listing", "contact buyer now", "past transactions", "buyleads"]
-        markers_out = ["free registration", "start selling", "sell on indiamart", "sign in"]
-        logged_in = any(m in html for m in markers_in)
-        logged_out = any(m in html for m in markers_out)
+        html = self._decode_html(resp)
+        logged_in = bool(self.LOGIN_IN_PATTERN.search(html))
+        logged_out = bool(self.LOGIN_OUT_PATTERN.search(html))
         status = "unknown"
         if logged_in and not logged_out:
             status = "logged_in"
@@ -2075,39 +2307,40 @@ class IndiaMartWorker(BaseWorker):
         for lead in leads:
             if lead.get("lead_id"):
                 continue
-            basis = {
-                "title": lead.get("title") or "",
-                "country": lead.get("country") or "",
-                "age_seconds": lead.get("age_seconds"),
-                "detail_url": lead.get("detail_url") or lead.get("url") or "",
-                "buyer_details_text": lead.get("buyer_details_text") or "",
-                "order_details_text": lead.get("order_details_text") or "",
-            }
-            digest = hashlib.sha1(json.dumps(basis, sort_keys=True).encode("utf-8")).hexdigest()
-            lead["lead_id"] = f"hash:{digest[:16]}"
+            basis = "\x1f".join((
+                str(lead.get("title") or ""),
+                str(lead.get("country") or ""),
+                str(lead.get("age_seconds")),
+                str(lead.get("detail_url") or lead.get("url") or ""),
+                str(lead.get("buyer_details_text") or ""),
+                str(lead.get("order_details_text") or ""),
+            ))
+            digest = hashlib.blake2b(basis.encode("utf-8"), digest_size=8).hexdigest()
+            lead["lead_id"] = f"hash:{digest}"
             lead["lead_id_synthetic"] = True
 
         # Track top-card changes for guaranteed observation
         top_lead = next((l for l in leads if l.get("top_card") or l.get("top_rank") == 1), None)
         if top_lead:
-            try:
-                state = self.load_state()
-                last_top = state.get("last_top_lead_id")
-                current_top = top_lead.get("lead_id")
-                if current_top and current_top != last_top:
-                    state["last_top_lead_id"] = current_top
-                    state["last_top_seen_at"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-                    state["last_top_title"] = top_lead.get("title")
-                    state["last_top_country"] = top_lead.get("country")
-                    self.write_state(state)
-                    print(f"[WORKER] Top lead changed: {current_top} | {top_lead.get('title')}")
-            except Exception:
-                pass
+            current_top = top_lead.get("lead_id")
+            if current_top and current_top != self._last_top_lead_id:
+                self._last_top_lead_id = current_top
+                self._stage_state(
+                    last_top_lead_id=current_top,
+                    last_top_seen_at=self._now_iso(),
+                    last_top_title=top_lead.get("title"),
+                    last_top_country=top_lead.get("country"),
+                )
+                print(f"[WORKER] Top lead changed: {current_top} | {top_lead.get('title')}")
 
         # --- KEYWORD & COUNTRY FILTERING ---
-        search_terms = [t.lower().strip() for t in (self.config.get("search_terms") or []) if t.strip()]
-        exclude_terms = [t.lower().strip() for t in (self.config.get("exclude_terms") or []) if t.strip()]
-        countries = [c.lower().strip() for c in (self.config.get("country") or []) if c.strip()]
+        # Normalized once per config load (see _with_filter_terms)
+        search_terms = self.config["_search_terms_lc"]
+        exclude_terms = self.config["_exclude_terms_lc"]
+        countries = self.config["_countries_lc"]
+        country_set = frozenset(countries)
+        country_codes = self.config["_country_codes"]
+        country_names = self.config["_country_names"]
         require_mobile = bool(self.config.get("require_mobile_available"))
         require_mobile_verified = bool(self.config.get("require_mobile_verified"))
         require_email_available = bool(self.config.get("require_email_available"))
@@ -2119,137 +2352,123 @@ class IndiaMartWorker(BaseWorker):
         allow_unknown = bool(self.config.get("allow_unknown_age"))
         min_member_months = int(self.config.get("min_member_months") or 0)
         max_age_hours = int(self.config.get("max_age_hours") or 0)
+        search_re = self._terms_pattern(search_terms)
+        exclude_re = self._terms_pattern(exclude_terms)
 
         filtered_leads = []
         rejected_leads = self.state.get("rejected_buffer", [])
+        filtered_append = filtered_leads.append
+        rejected_append = rejected_leads.append
         for lead in leads:
-            title = (lead.get("title") or "").lower()
-            age_seconds = lead.get("age_seconds")
-            
-            # 1. Exclude Terms (Strict Drop -> Mark Rejected)
-            if any(ex in title for ex in exclude_terms):
+            get = lead.get
+            # Cheapest predicates first: boolean flags, then numeric age,
+            # then substring/regex work.
+            if require_mobile and not (get("mobile_available") or get("mobile_verified")):
                 lead["status"] = "rejected"
-                filtered_leads.append(lead)
+                lead["rejected_reason"] = "mobile_missing"
+                rejected_append(lead)
                 continue
-            
+            if require_mobile_verified and not get("mobile_verified"):
+                lead["status"] = "rejected"
+                lead["rejected_reason"] = "mobile_unverified"
+                rejected_append(lead)
+                continue
+            if require_email_available and not (get("email_available") or get("email_verified")):
+                lead["status"] = "rejected"
+                lead["rejected_reason"] = "email_missing"
+                rejected_append(lead)
+                continue
+            if require_email and not get("email_verified"):
+                lead["status"] = "rejected"
+                lead["rejected_reason"] = "email_unverified"
+                rejected_append(lead)
+                continue
+            if require_whatsapp and not get("whatsapp_available"):
+                lead["status"] = "rejected"
+                lead["rejected_reason"] = "whatsapp_missing"
+                rejected_append(lead)
+                continue
+
+            age_seconds = get("age_seconds")
             if zero_only:
                 if age_seconds != 0:
                     lead["status"] = "rejected"
                     lead["rejected_reason"] = "age_not_zero"
-                    rejected_leads.append(lead)
+                    rejected_append(lead)
                     continue
             else:
                 if age_seconds is None and not allow_unknown:
                     lead["status"] = "rejected"
                     lead["rejected_reason"] = "age_unknown"
-                    rejected_leads.append(lead)
+                    rejected_append(lead)
                     continue
                 if age_seconds is not None and age_seconds > max_age:
                     lead["status"] = "rejected"
                     lead["rejected_reason"] = "age_too_old"
-                    rejected_leads.append(lead)
+                    rejected_append(lead)
                     continue
 
-            if require_mobile and not (lead.get("mobile_available") or lead.get("mobile_verified")):
-                lead["status"] = "rejected"
-                lead["rejected_reason"] = "mobile_missing"
-                rejected_leads.append(lead)
-                continue
-            if require_mobile_verified and not lead.get("mobile_verified"):
-                lead["status"] = "rejected"
-                lead["rejected_reason"] = "mobile_unverified"
-                rejected_leads.append(lead)
-                continue
-            if require_email_available and not (lead.get("email_available") or lead.get("email_verified")):
-                lead["status"] = "rejected"
-                lead["rejected_reason"] = "email_missing"
-                rejected_leads.append(lead)
-                continue
-            if require_email and not lead.get("email_verified"):
+            if max_age_hours and age_seconds is not None and age_seconds > max_age_hours * 3600:
                 lead["status"] = "rejected"
-                lead["rejected_reason"] = "email_unverified"
-                rejected_leads.append(lead)
+                lead["rejected_reason"] = "age_too_old"
+                rejected_append(lead)
                 continue
-            if require_whatsapp and not lead.get("whatsapp_available"):
+            
+            # Exclude Terms (Strict Drop -> Mark Rejected)
+            title = (get("title") or "").lower()
+            if exclude_re and exclude_re.search(title):
                 lead["status"] = "rejected"
-                lead["rejected_reason"] = "whatsapp_missing"
-                rejected_leads.append(lead)
+                filtered_append(lead)
                 continue
-
+            
             # Country filter (DOM path)
             if countries:
-                c_lower = (lead.get("country") or "").lower().strip()
-                c_tokens = set(re.split(r"\\W+", c_lower)) if c_lower else set()
-                c_code = (lead.get("country_code") or "").lower().strip()
-                match_found = False
-                for allowed in countries:
-                    allowed = (allowed or "").strip().lower()
-                    if not allowed:
-                        continue
-                    if c_code and allowed == c_code:
-                        match_found = True
-                        break
-                    if len(allowed) <= 3:
-                        if allowed in c_tokens:
-                            match_found = True
-                            break
-                    else:
-                        if c_lower and allowed in c_lower:
-                            match_found = True
-                            break
+                # No strip needed: tokens split on \W+ and the name check is a substring test
+                c_lower = (get("country") or "").lower()
+                c_tokens = set(self.COUNTRY_SPLIT_PATTERN.split(c_lower)) if c_lower else set()
+                c_code = (get("country_code") or "").lower().strip()
+                match_found = (
+                    (c_code and c_code in country_set)
+                    or not country_codes.isdisjoint(c_tokens)
+                    or (c_lower and any(name in c_lower for name in country_names))
+                )
                 if not match_found:
                     lead["status"] = "rejected"
                     lead["rejected_reason"] = "country_not_allowed"
-                    rejected_leads.append(lead)
+                    rejected_append(lead)
                     continue
 
-            # Quality filters (member age / max age hours)
+            # Quality filters (member age)
             if min_member_months:
-                months = self._parse_member_months(lead.get("member_since") or "")
+                months = self._parse_member_months(get("member_since") or "")
                 if months is None:
                     lead["status"] = "rejected"
                     lead["rejected_reason"] = "member_unknown"
-                    rejected_leads.append(lead)
+                    rejected_append(lead)
                     continue
                 if months < min_member_months:
                     lead["status"] = "rejected"
                     lead["rejected_reason"] = "member_too_new"
-                    rejected_leads.append(lead)
+                    rejected_append(lead)
                     continue
-            if max_age_hours and age_seconds is not None and age_seconds > max_age_hours * 3600:
-                lead["status"] = "rejected"
-                lead["rejected_reason"] = "age_too_old"
-                rejected_leads.append(lead)
-                continue
-            
-            # 2. Search Terms
-            if exclude_terms and any(ex in title for ex in exclude_terms):
+            # Search Terms
+            if search_re and not search_re.search(title):
                 lead["status"] = "rejected"
-                lead["rejected_reason"] = lead.get("rejected_reason") or "keyword_excluded"
-                rejected_leads.append(lead)
-                continue
-            if search_terms and not any(term in title for term in search_terms):
-                lead["status"] = "rejected"
-                lead["rejected_reason"] = lead.get("rejected_reason") or "keyword_miss"
-                rejected_leads.append(lead)
+                lead["rejected_reason"] = get("rejected_reason") or "keyword_miss"
+                rejected_append(lead)
                 continue
             
-            filtered_leads.append(lead)
+            filtered_append(lead)
 
         leads = filtered_leads
         filtered_count = len(leads)
         rejected_count = len(rejected_leads) if rejected_leads else 0
-        try:
-            state = self.load_state()
-            state["last_capture_counts"] = {
-                "raw": raw_count,
-                "filtered": filtered_count,
-                "rejected": rejected_count,
-                "ts": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-            }
-            self.write_state(state)
-        except Exception:
-            pass
+        self._stage_state(last_capture_counts={
+            "raw": raw_count,
+            "filtered": filtered_count,
+            "rejected": rejected_count,
+            "ts": self._now_iso(),
+        })
         print(f"[WORKER] Lead scan: raw={raw_count} filtered={filtered_count} rejected={rejected_count}")
         if rejected_leads:
             # Track rejections in metrics
@@ -2258,15 +2477,16 @@ class IndiaMartWorker(BaseWorker):
             self.state["rejected_buffer"] = rejected_leads
         # -----------------------------------
 
-        existing = self._load_existing_keys()
+        existing = self._get_seen_keys()
+        batch_keys = set()
         fresh = []
         for lead in leads:
             key = self._lead_key(lead)
-            if key in existing:
+            if key in existing or key in batch_keys:
                 continue
             lead["lead_key"] = key
             fresh.append(lead)
-            existing.add(key)
+            batch_keys.add(key)
 
         if fresh:
             # Count only unique, qualifying leads discovered this cycle.
@@ -2354,8 +2574,8 @@ class IndiaMartWorker(BaseWorker):
         self._record_action("verified_parsed", "WRITE_LEADS", verified=len(verified_lead_ids))
 
     def _write_leads_phase(self):
-        leads = self.state.get("leads_buffer", []) + self.state.get("rejected_buffer", [])
-        self._persist_leads(leads)
+        # Both buffers go to the DB in one batched upsert; chain avoids the copy
+        self._persist_leads(chain(self.state.get("leads_buffer", []), self.state.get("rejected_buffer", [])))
         self.state["leads_buffer"] = []
         self.state["rejected_buffer"] = []
         self._enter_cooldown("write_done")
@@ -2367,6 +2587,18 @@ class IndiaMartWorker(BaseWorker):
 
     # ---------- Tick ---------- #
 
+    # Phase name -> handler method name (looked up by name so overrides apply)
+    _PHASE_DISPATCH = {
+        "INIT": "_init_phase",
+        "FETCH_RECENT": "_fetch_recent_phase",
+        "PARSE_RECENT": "_parse_recent_phase",
+        "CLICK_LEADS": "_click_leads_phase",
+        "FETCH_VERIFIED": "_fetch_verified_phase",
+        "PARSE_VERIFIED": "_parse_verified_phase",
+        "WRITE_LEADS": "_write_leads_phase",
+        "COOLDOWN": "_cooldown_phase",
+    }
+
     def tick(self):
         # Hot-reload slot config (cached defaults)
         self.config = self._load_config()
@@ -2376,8 +2608,9 @@ class IndiaMartWorker(BaseWorker):
         # Only trigger if we are in a "stable" state like FETCH_RECENT
         current_phase = self.state.get("phase")
         ticks = self.state.get("ticks_since_verify", 0)
-        metrics = self.load_state().get("metrics", {})
-        clicked_baseline = self.load_state().get("run_clicked_start", 0)
+        slot_state = self.load_state()
+        metrics = slot_state.get("metrics", {})
+        clicked_baseline = slot_state.get("run_clicked_start", 0)
         clicked_total = metrics.get("clicked_total", 0)
         has_new_clicks = clicked_total > clicked_baseline
 
@@ -2391,28 +2624,17 @@ class IndiaMartWorker(BaseWorker):
 
         phase = self.state.get("phase", "INIT")
         try:
-            if phase == "INIT":
-                self._init_phase()
-            elif phase == "FETCH_RECENT":
-                self._fetch_recent_phase()
-            elif phase == "PARSE_RECENT":
-                self._parse_recent_phase()
-            elif phase == "CLICK_LEADS":
-                self._click_leads_phase()
-            elif phase == "FETCH_VERIFIED":
-                self._fetch_verified_phase()
-            elif phase == "PARSE_VERIFIED":
-                self._parse_verified_phase()
-            elif phase == "WRITE_LEADS":
-                self._write_leads_phase()
-            elif phase == "COOLDOWN":
-                self._cooldown_phase()
+            handler_name = self._PHASE_DISPATCH.get(phase)
+            if handler_name:
+                getattr(self, handler_name)()
             else:
                 self.state["phase"] = "INIT"
                 self._record_action("reset", "INIT")
         except Exception as exc:
             self.record_error(str(exc)[:200])
             self._enter_cooldown("unhandled_error")
+        finally:
+            self._flush_state()
 
     def shutdown(self):
         self._close_browser()
@@ -1,16 +1,18 @@
 import sys
 import os
-import uuid
 import json
 import logging
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Setup paths
 BASE_DIR = Path(__file__).resolve().parent.parent
 sys.path.append(str(BASE_DIR))
 
-from sqlalchemy import select
+from sqlalchemy import insert, select
+from api.crud import get_users_by_email
+from core.json_utils import dump_json
 from api.db import SessionLocal
 from api.models import User, UserSlot, UserEmail, Slot
 
@@ -42,100 +44,138 @@ def load_clients():
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("Provision")
 
+FILE_WRITE_WORKERS = 16
+
+def write_slot_files(item):
+    """Create a slot directory plus slot_state.json/config.json if missing."""
+    slot_id, name, state_bytes, config_bytes = item
+    try:
+        # 3. Create Slot Directory (outside transaction)
+        slot_dir = BASE_DIR / "slots" / slot_id
+        slot_dir.mkdir(parents=True, exist_ok=True)
+        
+        # 4. Create slot_state.json if missing
+        state_path = slot_dir / "slot_state.json"
+        if not state_path.exists():
+            logger.info(f"Creating default state for {slot_id}")
+            state_path.write_bytes(state_bytes)
+        
+        # 5. Create config.json (legacy support)
+        config_path = slot_dir / "config.json"
+        if not config_path.exists():
+            config_path.write_bytes(config_bytes)
+        
+        logger.info(f"✅ Successfully provisioned {name}")
+        
+    except Exception as e:
+        logger.error(f"Failed to provision {name}: {e}")
+        import traceback
+        traceback.print_exc()
+
 def provision():
-    """Provision clients with atomic transactions per client."""
+    """Provision all clients in one transaction, then create their slot files."""
     clients = load_clients()
     
     if not clients:
         logger.warning("No clients to provision. Exiting.")
         return
     
-    for client in clients:
-        email = client["email"]
-        slot_id = client["slot_id"]
-        name = client["name"]
-        
-        logger.info(f"Processing {name} ({email})...")
-        
-        # Use single transaction for all DB operations per client
-        db = SessionLocal()
-        try:
-            with db.begin():
-                # 1. Create/Get User
-                user = db.scalar(select(User).where(User.email == email))
-                if not user:
-                    logger.info(f"Creating user {email}")
-                    user = User(
-                        id=uuid.uuid4(),
-                        email=email,
-                        role="client",
-                        disabled=False,
-                        onboarding_complete=True,
-                        created_at=datetime.utcnow(),
-                        updated_at=datetime.utcnow()
-                    )
-                    db.add(user)
-                    db.flush()  # Get user.id without committing
-                else:
+    emails = list(dict.fromkeys(client["email"] for client in clients))
+    # One timestamp for the whole batch (rows and slot_state.json alike)
+    now = datetime.utcnow()
+    now_iso = now.isoformat()
+    
+    # Single session/transaction: one existence SELECT per table, bulk inserts
+    db = SessionLocal()
+    try:
+        with db.begin():
+            # 1. Create/Get Users
+            existing_users = get_users_by_email(db, emails)
+            user_ids = {}
+            new_users = []
+            for email in emails:
+                user = existing_users.get(email)
+                if user:
                     logger.info(f"User {email} exists.")
-
-                # 2. Grant Slot Permission
-                user_slot = db.scalar(select(UserSlot).where(
-                    UserSlot.user_id == user.id, 
-                    UserSlot.slot_id == slot_id
-                ))
-                if not user_slot:
-                    logger.info(f"Granting slot {slot_id} to {email}")
-                    user_slot = UserSlot(
-                        id=uuid.uuid4(),
-                        user_id=user.id,
-                        slot_id=slot_id,
-                        role="owner",
-                        created_at=datetime.utcnow()
-                    )
-                    db.add(user_slot)
-                
-                # Transaction commits here automatically
+                    user_ids[email] = user.id
+                    continue
+                logger.info(f"Creating user {email}")
+                new_users.append({
+                    "email": email,
+                    "role": "client",
+                    "disabled": False,
+                    "onboarding_complete": True,
+                    "created_at": now,
+                    "updated_at": now,
+                })
             
-            # 3. Create Slot Directory (outside transaction)
-            slot_dir = BASE_DIR / "slots" / slot_id
-            slot_dir.mkdir(parents=True, exist_ok=True)
+            # Core INSERT ... RETURNING: no ORM unit-of-work per new user
+            if new_users:
+                result = db.execute(insert(User).values(new_users).returning(User.id, User.email))
+                user_ids.update({row.email: row.id for row in result})
             
-            # 4. Create slot_state.json if missing
-            state_path = slot_dir / "slot_state.json"
-            if not state_path.exists():
-                logger.info(f"Creating default state for {slot_id}")
-                state = {
-                    "slot_id": slot_id,
-                    "status": "STOPPED",
-                    "mode": "ACTIVE",
-                    "worker_type": "indiamart_worker",
-                    "config": {
-                        "keywords": client.get("keywords", []),
-                        "min_budget": 0,
-                        "location_filter": "Pan India"
-                    },
-                    "last_updated": datetime.utcnow().isoformat()
+            # 2. Grant Slot Permissions (only pre-existing users can have grants)
+            existing_slots = set()
+            if existing_users:
+                existing_slots = {
+                    (user_slot.user_id, user_slot.slot_id)
+                    for user_slot in db.scalars(
+                        select(UserSlot).where(
+                            UserSlot.user_id.in_([user.id for user in existing_users.values()])
+                        )
+                    )
                 }
-                state_path.write_text(json.dumps(state, indent=2))
-            
-            # 5. Create config.json (legacy support)
-            config_path = slot_dir / "config.json"
-            if not config_path.exists():
-                config_path.write_text(json.dumps({
-                    "slot_id": slot_id,
-                    "refresh_min": 5,
-                    "refresh_max": 20
-                }, indent=2))
+            new_user_slots = []
+            for client in clients:
+                key = (user_ids[client["email"]], client["slot_id"])
+                if key in existing_slots:
+                    continue
+                logger.info(f"Granting slot {client['slot_id']} to {client['email']}")
+                existing_slots.add(key)
+                new_user_slots.append({
+                    "user_id": key[0],
+                    "slot_id": key[1],
+                    "created_at": now,
+                })
             
-            logger.info(f"✅ Successfully provisioned {name}")
+            if new_user_slots:
+                db.execute(insert(UserSlot).values(new_user_slots))
             
-        except Exception as e:
-            logger.error(f"Failed to provision {name}: {e}")
-            import traceback
-            traceback.print_exc()
-        finally:
-            db.close()
+            # Transaction commits here automatically
+    except Exception as e:
+        logger.error(f"Failed to provision clients: {e}")
+        import traceback
+        traceback.print_exc()
+        return
+    finally:
+        db.close()
+    
+    # 3-5. Slot directories/files: JSON is serialized here, the independent
+    # mkdir/write syscalls are overlapped on a thread pool.
+    items = []
+    for client in clients:
+        slot_id = client["slot_id"]
+        state = {
+            "slot_id": slot_id,
+            "status": "STOPPED",
+            "mode": "ACTIVE",
+            "worker_type": "indiamart_worker",
+            "config": {
+                "keywords": client.get("keywords", []),
+                "min_budget": 0,
+                "location_filter": "Pan India"
+            },
+            "last_updated": now_iso
+        }
+        config = {
+            "slot_id": slot_id,
+            "refresh_min": 5,
+            "refresh_max": 20
+        }
+        items.append((slot_id, client["name"], dump_json(state), dump_json(config)))
+    
+    with ThreadPoolExecutor(max_workers=FILE_WRITE_WORKERS) as executor:
+        list(executor.map(write_slot_files, items))
     
     logger.info("✅ All clients provisioned successfully!")
 
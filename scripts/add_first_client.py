@@ -5,9 +5,10 @@ from pathlib import Path
 # Add root to python path to allow importing 'api'
 sys.path.append(str(Path(__file__).parent.parent))
 
+from api.crud import ensure_slots, get_users_by_email
 from api.db import SessionLocal
-from api.models import User, UserSlot, Slot
-from sqlalchemy import select, delete
+from api.models import User, UserSlot
+from sqlalchemy import delete
 
 def run():
     print("Connecting to DB...")
@@ -18,7 +19,7 @@ def run():
         
         # 1. Ensure User
         print(f"Checking user {email}...")
-        user = db.scalar(select(User).where(User.email == email))
+        user = get_users_by_email(db, [email]).get(email)
         if not user:
             print(f"Creating new user: {email}")
             user = User(email=email, role="client", disabled=False)
@@ -28,9 +29,8 @@ def run():
             print(f"User already exists: {user.id}")
             
         # 2. Ensure Slot in DB
-        if not db.get(Slot, slot_id):
-            print(f"Registering slot {slot_id} in DB")
-            db.add(Slot(id=slot_id))
+        print(f"Registering slot {slot_id} in DB (if missing)")
+        ensure_slots(db, [slot_id])
         
         # 3. Create Slot Directory
         slot_dir = Path("slots") / slot_id
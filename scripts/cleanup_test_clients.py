@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 import os
 from pathlib import Path
 import shutil
@@ -7,18 +8,25 @@ import sys
 
 import yaml
 
+try:
+    from yaml import CSafeDumper as YamlDumper, CSafeLoader as YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeDumper as YamlDumper, SafeLoader as YamlLoader
+
+RMTREE_WORKERS = 8
+
 
 def load_users(path: Path):
     if not path.exists():
         return []
     try:
-        return yaml.safe_load(path.read_text()) or []
+        return yaml.load(path.read_text(), Loader=YamlLoader) or []
     except Exception:
         return []
 
 
 def save_users(path: Path, users):
-    path.write_text(yaml.safe_dump(users, sort_keys=False))
+    path.write_text(yaml.dump(users, Dumper=YamlDumper, sort_keys=False))
 
 
 def is_email_identity(user: dict) -> bool:
@@ -56,28 +64,26 @@ def main():
         print(f"No users found in {users_path}.")
         return 0
 
+    # Single pass: bucket each user and collect their slot ids at the same time
     keep = []
     removed = []
+    keep_slot_ids = set()
+    candidate_slot_ids = set()
     for user in users:
         role = str(user.get("role") or "").strip().lower()
         if role == "admin" or is_email_identity(user):
             keep.append(user)
+            slot_ids = keep_slot_ids
         else:
             removed.append(user)
-
-    keep_slot_ids = set()
-    for user in keep:
+            slot_ids = candidate_slot_ids
         for entry in (user.get("allowed_slots") or []):
             slot_id = normalize_slot_id(entry)
             if slot_id:
-                keep_slot_ids.add(slot_id)
+                slot_ids.add(slot_id)
 
-    removed_slot_ids = set()
-    for user in removed:
-        for entry in (user.get("allowed_slots") or []):
-            slot_id = normalize_slot_id(entry)
-            if slot_id and slot_id not in keep_slot_ids:
-                removed_slot_ids.add(slot_id)
+    # Slots shared with a kept user stay
+    removed_slot_ids = candidate_slot_ids - keep_slot_ids
 
     if not removed and not removed_slot_ids:
         print("No test clients or slots to remove.")
@@ -100,10 +106,11 @@ def main():
     save_users(users_path, keep)
 
     if slots_dir.exists():
-        for slot_id in removed_slot_ids:
-            target = slots_dir / slot_id
-            if target.exists() and target.is_dir():
-                shutil.rmtree(target)
+        targets = [slots_dir / slot_id for slot_id in removed_slot_ids]
+        targets = [target for target in targets if target.is_dir()]
+        # Slot trees are independent; overlap the unlink/rmdir syscalls
+        with ThreadPoolExecutor(max_workers=RMTREE_WORKERS) as executor:
+            list(executor.map(shutil.rmtree, targets))
     return 0
 
 
@@ -5,32 +5,30 @@ import sys
 from pathlib import Path
 from typing import Optional
 
-from sqlalchemy import delete, select
+from sqlalchemy import delete, insert, select
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
 
+from api.crud import ensure_slots  # noqa: E402
 from api.db import SessionLocal  # noqa: E402
-from api.models import DemoCode, Slot  # noqa: E402
+from api.models import DemoCode  # noqa: E402
 
 
-def ensure_slot(db, slot_id: str):
-    if not slot_id:
-        return
-    if db.get(Slot, slot_id):
-        return
-    db.add(Slot(id=slot_id))
-
-
-def generate_code(prefix: str, length: int, existing: set[str]) -> str:
-    length = max(6, length)
-    while True:
-        code = secrets.token_hex(length // 2).upper()
-        value = f"{prefix}{code}"
-        if value not in existing:
-            existing.add(value)
-            return value
+def generate_codes(prefix: str, length: int, count: int, existing: set[str]) -> list[str]:
+    """Generate `count` unique codes, re-rolling only the ones that collide."""
+    nbytes = max(6, length) // 2
+    codes: list[str] = []
+    while len(codes) < count:
+        candidates = {
+            f"{prefix}{secrets.token_bytes(nbytes).hex().upper()}"
+            for _ in range(count - len(codes))
+        }
+        fresh = candidates - existing
+        existing |= fresh
+        codes.extend(fresh)
+    return codes
 
 
 def parse_slots(arg: Optional[str], prefix: str, start: int, count: int) -> list[str]:
@@ -58,31 +56,38 @@ def main() -> int:
     db = SessionLocal()
     try:
         existing_codes = set(db.execute(select(DemoCode.code)).scalars().all())
-        results = []
 
-        for slot_id in slots:
-            if args.rotate:
-                db.execute(delete(DemoCode).where(DemoCode.slot_id == slot_id))
-
-            existing = db.scalar(
-                select(DemoCode).where(DemoCode.slot_id == slot_id, DemoCode.active.is_(True))
+        # One DELETE or one SELECT for all slots instead of one per slot
+        codes_by_slot: dict[str, str] = {}
+        if args.rotate:
+            db.execute(delete(DemoCode).where(DemoCode.slot_id.in_(slots)))
+        else:
+            active_codes = db.scalars(
+                select(DemoCode).where(DemoCode.slot_id.in_(slots), DemoCode.active.is_(True))
             )
-            if existing:
-                results.append((slot_id, existing.code))
-                continue
+            for existing in active_codes:
+                codes_by_slot.setdefault(existing.slot_id, existing.code)
+
+        missing = [slot_id for slot_id in dict.fromkeys(slots) if slot_id not in codes_by_slot]
+        generated = generate_codes(args.code_prefix, args.code_length, len(missing), existing_codes)
+        new_codes = []
+        for slot_id, code in zip(missing, generated):
+            codes_by_slot[slot_id] = code
+            new_codes.append({"code": code, "slot_id": slot_id, "active": True})
+        results = [(slot_id, codes_by_slot[slot_id]) for slot_id in slots]
 
-            ensure_slot(db, slot_id)
-            code = generate_code(args.code_prefix, args.code_length, existing_codes)
-            db.add(DemoCode(code=code, slot_id=slot_id, active=True))
-            results.append((slot_id, code))
+        if new_codes:
+            ensure_slots(db, [row["slot_id"] for row in new_codes])
+            db.execute(insert(DemoCode), new_codes)
 
         db.commit()
     finally:
         db.close()
 
-    print("Slot,Code")
-    for slot_id, code in results:
-        print(f"{slot_id},{code}")
+    # One write instead of a print (and a syscall when piped) per code
+    lines = ["Slot,Code"]
+    lines.extend(f"{slot_id},{code}" for slot_id, code in results)
+    sys.stdout.write("\n".join(lines) + "\n")
 
     return 0
 
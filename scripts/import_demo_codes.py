@@ -5,21 +5,15 @@ import sys
 from pathlib import Path
 
 from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
 
+from api.crud import ensure_slots  # noqa: E402
 from api.db import SessionLocal  # noqa: E402
-from api.models import DemoCode, Slot  # noqa: E402
-
-
-def ensure_slot(db, slot_id: str):
-    if not slot_id:
-        return
-    if db.get(Slot, slot_id):
-        return
-    db.add(Slot(id=slot_id))
+from api.models import DemoCode  # noqa: E402
 
 
 def load_codes(path: Path) -> list[tuple[str, str]]:
@@ -66,25 +60,53 @@ def main() -> int:
 
     db = SessionLocal()
     try:
+        slot_by_code: dict[str, str] = {}
         for slot_id, code in entries:
-            if args.rotate:
-                db.execute(delete(DemoCode).where(DemoCode.slot_id == slot_id))
-
-            existing_code = db.get(DemoCode, code)
+            assigned = slot_by_code.setdefault(code, slot_id)
+            if assigned != slot_id:
+                raise ValueError(f"Code {code} listed for both {assigned} and {slot_id}")
+        if args.rotate:
+            db.execute(delete(DemoCode).where(DemoCode.slot_id.in_(set(slot_by_code.values()))))
+
+        # One SELECT for every code in the file instead of a get() per row;
+        # every listed code is checked, including ones dropped below
+        existing_by_code = {
+            existing.code: existing
+            for existing in db.scalars(select(DemoCode).where(DemoCode.code.in_(list(slot_by_code))))
+        }
+        for code, slot_id in slot_by_code.items():
+            existing_code = existing_by_code.get(code)
             if existing_code and existing_code.slot_id != slot_id:
                 raise ValueError(f"Code {code} already assigned to {existing_code.slot_id}")
 
-            existing_slot_code = db.scalar(
-                select(DemoCode).where(DemoCode.slot_id == slot_id, DemoCode.active.is_(True))
+        # A slot keeps one active code: as in the old row-by-row import, the
+        # last code listed for a slot wins and earlier ones are not kept
+        code_by_slot = {slot_id: code for slot_id, code in entries}
+        skipped = len(slot_by_code) - len(code_by_slot)
+        if skipped:
+            print(f"Skipping {skipped} earlier codes of slots listed more than once "
+                  "(the last code per slot is kept)")
+        slot_ids = list(code_by_slot)
+        codes = list(code_by_slot.values())
+
+        # Drop other active codes of these slots, then upsert the file's codes
+        db.execute(
+            delete(DemoCode).where(
+                DemoCode.slot_id.in_(slot_ids),
+                DemoCode.active.is_(True),
+                DemoCode.code.not_in(codes),
             )
-            if existing_slot_code and existing_slot_code.code != code:
-                db.delete(existing_slot_code)
-
-            ensure_slot(db, slot_id)
-            if existing_code:
-                existing_code.active = True
-            else:
-                db.add(DemoCode(code=code, slot_id=slot_id, active=True))
+        )
+        ensure_slots(db, slot_ids)
+
+        upsert = pg_insert(DemoCode).on_conflict_do_update(
+            index_elements=[DemoCode.code],
+            set_={"active": True},
+        )
+        db.execute(
+            upsert,
+            [{"code": code, "slot_id": slot_id, "active": True} for slot_id, code in code_by_slot.items()],
+        )
 
         db.commit()
     finally:
@@ -6,6 +6,11 @@ import sqlite3
 import time
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is used otherwise
+    orjson = None
+
 # Setup paths
 BASE_DIR = Path(os.environ.get("BASE_DIR_ENV") or Path(__file__).resolve().parent.parent)
 sys.path.append(str(BASE_DIR))
@@ -17,86 +22,141 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(
 logger = logging.getLogger("migration")
 
 SLOTS_DIR = BASE_DIR / "slots"
+BATCH_SIZE = 5000
 
-def migrate_slot(slot_name: str):
-    slot_dir = SLOTS_DIR / slot_name
-    leads_path = slot_dir / "leads.jsonl"
-    
+json_loads = orjson.loads if orjson else json.loads
+
+# Fast path for a first import: rows whose lead_id already exists are skipped
+INSERT_NEW_LEAD_SQL = """
+    INSERT OR IGNORE INTO leads (
+        lead_id, slot_id, title, url, country, status, 
+        fetched_at, clicked_at, raw_data
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+UPSERT_LEAD_SQL = """
+    INSERT INTO leads (
+        lead_id, slot_id, title, url, country, status, 
+        fetched_at, clicked_at, raw_data
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(lead_id) DO UPDATE SET
+        status=excluded.status,
+        clicked_at=excluded.clicked_at,
+        raw_data=excluded.raw_data,
+        updated_at=CURRENT_TIMESTAMP
+"""
+
+def parse_lead_line(slot_name: str, line: str):
+    """Turn one leads.jsonl line into an insert row; None for lines to skip."""
+    line = line.strip()
+    if not line:
+        return None
+
+    try:
+        lead = json_loads(line)
+    except json.JSONDecodeError:  # orjson's error subclasses it
+        return None
+    if not isinstance(lead, dict):
+        return None
+
+    lead_id = lead.get("lead_id") or lead.get("id")
+    if not lead_id:
+        # Try to synthesize ID from URL or title?
+        # No, skip unsafe data
+        return None
+
+    # Fix timestamps
+    fetched_at = lead.get("fetched_at")
+    clicked_at = lead.get("clicked_at")
+
+    # Prepare row
+    title = lead.get("title")
+    url = lead.get("url") or lead.get("detail_url")
+    country = lead.get("country")
+    status = lead.get("status", "captured")
+
+    # The line was just validated as JSON; store it as-is rather than
+    # re-serializing the parsed dict.
+    return (
+        lead_id, slot_name, title, url, country, status,
+        fetched_at, clicked_at, line
+    )
+
+
+def write_rows(conn, batch: list):
+    inserted = conn.executemany(INSERT_NEW_LEAD_SQL, batch).rowcount
+    if inserted < len(batch):
+        # Some lead_ids already existed (re-run or repeated lines):
+        # replay the batch as an upsert so later rows still win.
+        conn.executemany(UPSERT_LEAD_SQL, batch)
+
+
+def migrate_slot(conn, slot_name: str):
+    """
+    Stream a slot's leads.jsonl into SQLite in BATCH_SIZE executemany batches.
+    Each slot is one transaction; a slot that fails is rolled back and logged,
+    and the migration moves on to the next one.
+    """
+    leads_path = SLOTS_DIR / slot_name / "leads.jsonl"
     if not leads_path.exists():
         logger.warning(f"No leads.jsonl found for {slot_name}")
         return
 
     logger.info(f"Importing {leads_path}...")
-    
     count = 0
-    errors = 0
     t0 = time.time()
-    
-    with leads_path.open("r", encoding="utf-8") as f:
-        # Use a single connection for bulk insert speed (though save_lead opens its own, 
-        # for migration efficiently we should probably batch, but reuse existing logic for safety)
-        # To make it fast, we can't reuse save_lead_to_db naively if it opens/closes on every call.
-        # Let's write a batch inserter here.
-        
-        conn = get_connection()
-        try:
-            with conn:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                        
-                    try:
-                        lead = json.loads(line)
-                    except json.JSONDecodeError:
-                        continue
-                        
-                    lead_id = lead.get("lead_id") or lead.get("id")
-                    if not lead_id:
-                        # Try to synthesize ID from URL or title?
-                        # No, skip unsafe data
-                        continue
-                        
-                    # Fix timestamps
-                    fetched_at = lead.get("fetched_at")
-                    clicked_at = lead.get("clicked_at")
-                    
-                    # Prepare row
-                    title = lead.get("title")
-                    url = lead.get("url") or lead.get("detail_url")
-                    country = lead.get("country")
-                    status = lead.get("status", "captured")
-                    raw_json = json.dumps(lead)
-                    
-                    conn.execute("""
-                        INSERT INTO leads (
-                            lead_id, slot_id, title, url, country, status, 
-                            fetched_at, clicked_at, raw_data
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        ON CONFLICT(lead_id) DO UPDATE SET
-                            status=excluded.status,
-                            clicked_at=excluded.clicked_at,
-                            raw_data=excluded.raw_data,
-                            updated_at=CURRENT_TIMESTAMP
-                    """, (
-                        lead_id, slot_name, title, url, country, status, 
-                        fetched_at, clicked_at, raw_json
-                    ))
-                    count += 1
-                    
-                    if count % 1000 == 0:
-                        logger.info(f"  Processed {count} records...")
-                        
-        except Exception as e:
-            logger.error(f"Migration failed for {slot_name}: {e}")
-            errors += 1
-        finally:
-            conn.close()
-            
+    try:
+        with leads_path.open("r", encoding="utf-8") as f:
+            batch = []
+            for line in f:
+                row = parse_lead_line(slot_name, line)
+                if row is None:
+                    continue
+                batch.append(row)
+                if len(batch) >= BATCH_SIZE:
+                    write_rows(conn, batch)
+                    count += len(batch)
+                    batch = []
+                    logger.info(f"  Processed {count} records...")
+            if batch:
+                write_rows(conn, batch)
+                count += len(batch)
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"Migration failed for {slot_name}: {e}")
+        return
+
     dt = time.time() - t0
     logger.info(f"✅ {slot_name}: Imported {count} leads in {dt:.2f}s")
 
 
+def drop_lead_indexes() -> list:
+    """Drop secondary indexes on leads; returns their CREATE statements."""
+    conn = get_connection()
+    try:
+        rows = conn.execute(
+            "SELECT name, sql FROM sqlite_master "
+            "WHERE type='index' AND tbl_name='leads' AND sql IS NOT NULL"
+        ).fetchall()
+        with conn:
+            for row in rows:
+                conn.execute(f'DROP INDEX IF EXISTS "{row["name"]}"')
+        return [row["sql"] for row in rows]
+    finally:
+        conn.close()
+
+
+def restore_lead_indexes(create_sqls: list):
+    conn = get_connection()
+    try:
+        with conn:
+            for sql in create_sqls:
+                conn.execute(sql)
+    finally:
+        conn.close()
+
+
 def main():
     logger.info("🚀 Starting JSONL -> SQLite Migration")
     
@@ -108,10 +168,28 @@ def main():
         logger.error("Slots directory not found!")
         return
         
-    slots = sorted([d.name for d in SLOTS_DIR.iterdir() if d.is_dir() and d.name.startswith("slot")])
+    # DirEntry.is_dir() uses the d_type from the directory listing, no stat per entry
+    with os.scandir(SLOTS_DIR) as entries:
+        slots = sorted(e.name for e in entries if e.name.startswith("slot") and e.is_dir())
     
-    for slot in slots:
-        migrate_slot(slot)
+    # Indexes are rebuilt once after the load instead of maintained per row
+    index_sqls = drop_lead_indexes()
+    try:
+        # Single connection for all slots; rows are bound in batches with
+        # executemany instead of one execute() per lead.
+        conn = get_connection()
+        try:
+            # Bulk-load mode: the migration can simply be re-run if interrupted.
+            # journal_mode is left alone (the connection is already in WAL).
+            conn.execute("PRAGMA synchronous=OFF;")
+            conn.execute("PRAGMA temp_store=MEMORY;")
+            for slot_name in slots:
+                migrate_slot(conn, slot_name)
+        finally:
+            conn.close()
+    finally:
+        logger.info(f"Rebuilding {len(index_sqls)} indexes...")
+        restore_lead_indexes(index_sqls)
         
     logger.info("✨ Migration Complete")
 
@@ -12,6 +12,7 @@ import os
 import sys
 import json
 import logging
+from datetime import datetime
 from pathlib import Path
 
 # Set environment to use Postgres
@@ -21,7 +22,6 @@ os.environ['USE_POSTGRES'] = 'true'
 BASE_DIR = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(BASE_DIR))
 
-from core.db.database import save_lead_to_db
 from sqlalchemy import create_engine, text
 import sqlite3
 
@@ -43,6 +43,68 @@ if not SQLITE_DB.exists():
     logger.error(f"SQLite database not found at {SQLITE_DB}")
     sys.exit(1)
 
+PROGRESS_EVERY = 10000
+
+LEAD_COLUMNS = (
+    "lead_id, slot_id, title, url, country, status, "
+    "fetched_at, clicked_at, verified_at, raw_data"
+)
+
+# Rows are COPYed into a temp table, then merged with one upsert so re-runs
+# behave like save_lead_to_db (update existing leads, insert new ones).
+CREATE_STAGING_SQL = """
+    CREATE TEMP TABLE leads_import
+    (LIKE leads INCLUDING DEFAULTS) ON COMMIT DROP
+"""
+COPY_STAGING_SQL = f"COPY leads_import ({LEAD_COLUMNS}) FROM STDIN"
+MERGE_STAGING_SQL = f"""
+    INSERT INTO leads ({LEAD_COLUMNS})
+    SELECT DISTINCT ON (lead_id) {LEAD_COLUMNS}
+    FROM leads_import
+    ORDER BY lead_id, fetched_at DESC NULLS LAST
+    ON CONFLICT (lead_id) DO UPDATE SET
+        title = EXCLUDED.title,
+        url = EXCLUDED.url,
+        country = EXCLUDED.country,
+        status = EXCLUDED.status,
+        clicked_at = EXCLUDED.clicked_at,
+        verified_at = EXCLUDED.verified_at,
+        raw_data = EXCLUDED.raw_data,
+        updated_at = now()
+"""
+
+
+def _pg_lead_key(slot_id: str, lead_id: str) -> str:
+    """Slot-namespaced key; SQLite rows written by the worker already carry it."""
+    lead_id = str(lead_id or "").strip()
+    if not lead_id or lead_id.startswith(f"{slot_id}::"):
+        return lead_id
+    return f"{slot_id}::{lead_id}"
+
+def _pg_timestamp(value):
+    """
+    Parse a SQLite timestamp for the timestamptz columns; raises ValueError on
+    values COPY would reject, so the row can be counted as an error instead of
+    aborting the whole COPY.
+    """
+    if value is None or value == "":
+        return None
+    text_value = str(value).strip()
+    if text_value.endswith("Z"):  # fromisoformat() only accepts "Z" from 3.11 on
+        text_value = text_value[:-1] + "+00:00"
+    return datetime.fromisoformat(text_value)
+
+
+def _pg_raw_data(value):
+    """Validate raw_data as JSON COPY can load into jsonb; raises ValueError otherwise."""
+    if not value:
+        return None
+    json.loads(value)
+    if "\\u0000" in value:  # valid JSON, but jsonb cannot store NUL
+        raise ValueError("raw_data contains \\u0000")
+    return value
+
+
 def migrate_leads():
     """Migrate all leads from SQLite to Postgres"""
     
@@ -52,7 +114,6 @@ def migrate_leads():
     
     # Connect to SQLite
     sqlite_conn = sqlite3.connect(SQLITE_DB)
-    sqlite_conn.row_factory = sqlite3.Row
     
     # Get total count
     cursor = sqlite_conn.execute("SELECT COUNT(*) FROM leads")
@@ -76,46 +137,53 @@ def migrate_leads():
             logger.error("Leads table does not exist in Postgres! Run Alembic migrations first.")
             sys.exit(1)
     
-    # Migrate in batches
-    batch_size = 100
+    # Stream SQLite rows into Postgres via COPY (psycopg 3)
     migrated = 0
     errors = 0
     
-    cursor = sqlite_conn.execute("SELECT * FROM leads ORDER BY fetched_at")
+    # Plain tuples in COPY column order; SQLite streams rows as we iterate
+    cursor = sqlite_conn.execute(f"SELECT {LEAD_COLUMNS} FROM leads ORDER BY fetched_at")
     
-    while True:
-        rows = cursor.fetchmany(batch_size)
-        if not rows:
-            break
-        
-        for row in rows:
-            try:
-                # Convert SQLite row to dict
-                lead_data = dict(row)
-                
-                # Parse JSON raw_data if needed
-                if lead_data.get('raw_data'):
-                    try:
-                        lead_data['raw_data'] = json.loads(lead_data['raw_data'])
-                    except:
-                        pass
-                
-                # Prepare for Postgres
-                slot_id = lead_data.get('slot_id')
+    raw_conn = pg_engine.raw_connection()
+    try:
+        pg_cur = raw_conn.cursor()
+        pg_cur.execute(CREATE_STAGING_SQL)
+        with pg_cur.copy(COPY_STAGING_SQL) as copy:
+            for lead_id, slot_id, title, url, country, status, fetched_at, clicked_at, verified_at, raw_data in cursor:
                 if not slot_id:
-                    logger.warning(f"Skipping lead {lead_data.get('lead_id')} - no slot_id")
+                    logger.warning(f"Skipping lead {lead_id} - no slot_id")
                     continue
-                
-                # Save to Postgres
-                save_lead_to_db(lead_data, slot_id)
+                lead_key = _pg_lead_key(slot_id, lead_id)
+                if not lead_key:
+                    errors += 1
+                    continue
+                # A value COPY rejects would abort the whole load: check rows here
+                try:
+                    fetched_at = _pg_timestamp(fetched_at)
+                    clicked_at = _pg_timestamp(clicked_at)
+                    verified_at = _pg_timestamp(verified_at)
+                    # raw_data is already JSON text (written with json.dumps); pass it through
+                    raw_data = _pg_raw_data(raw_data)
+                except (TypeError, ValueError) as e:
+                    logger.error(f"Failed to migrate lead {lead_id}: {e}")
+                    errors += 1
+                    continue
+                copy.write_row((
+                    lead_key, slot_id, title, url, country, status or 'captured',
+                    fetched_at, clicked_at, verified_at, raw_data,
+                ))
                 migrated += 1
                 
-                if migrated % 100 == 0:
+                if migrated % PROGRESS_EVERY == 0:
                     logger.info(f"   Progress: {migrated}/{total} ({migrated*100//total}%)")
-                    
-            except Exception as e:
-                logger.error(f"Failed to migrate lead {row.get('lead_id')}: {e}")
-                errors += 1
+        
+        pg_cur.execute(MERGE_STAGING_SQL)
+        raw_conn.commit()
+    except Exception:
+        raw_conn.rollback()
+        raise
+    finally:
+        raw_conn.close()
     
     sqlite_conn.close()
     
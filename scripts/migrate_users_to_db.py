@@ -1,21 +1,62 @@
 #!/usr/bin/env python3
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 import os
 import sys
 from pathlib import Path
 import shutil
+import uuid
 from typing import Optional
 
 import yaml
-from sqlalchemy import delete, select
+from sqlalchemy import delete, func, insert, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as YamlLoader
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
 
-from api.db import SessionLocal  # noqa: E402
+from api.crud import ensure_slots  # noqa: E402
+from api.db import SessionLocal, engine  # noqa: E402
 from api.models import Slot, User, UserEmail, UserSlot  # noqa: E402
 
+# Above this many users, rows are streamed with COPY instead of INSERT
+COPY_THRESHOLD = 1000
+# Rows per multi-VALUES statement when SQLAlchemy batches an executemany INSERT
+INSERT_PAGE_SIZE = 5000
+# Bound parameters per IN (...) list; psycopg caps a statement at 65535
+IN_CLAUSE_CHUNK = 5000
+
+# COPY cannot resolve conflicts itself: users are staged in a temp table and
+# merged with one upsert, mirroring the statement built in upsert_users().
+CREATE_USERS_STAGING_SQL = """
+    CREATE TEMP TABLE users_import
+    (id uuid, email text, role text, disabled boolean) ON COMMIT DROP
+"""
+COPY_USERS_STAGING_SQL = "COPY users_import (id, email, role, disabled) FROM STDIN"
+MERGE_USERS_SQL = """
+    INSERT INTO users (id, email, role, disabled, onboarding_complete)
+    SELECT id, email, role, disabled, false FROM users_import
+    ON CONFLICT (email) DO {action}
+    RETURNING email, id
+"""
+MERGE_USERS_UPDATE = "UPDATE SET role = EXCLUDED.role, disabled = EXCLUDED.disabled, updated_at = now()"
+COPY_USER_SLOTS_SQL = "COPY user_slots (user_id, slot_id) FROM STDIN"
+
+# Secondary indexes dropped for a --reset load and rebuilt in one pass before
+# commit. The unique email indexes (ix_users_email, ix_user_emails_email)
+# stay: they are the arbiters of the ON CONFLICT clauses.
+RESET_REBUILT_INDEXES = {
+    "ix_user_emails_user_id": "CREATE INDEX ix_user_emails_user_id ON user_emails (user_id)",
+}
+
+RMTREE_WORKERS = 8
+
 
 def normalize_email(email: Optional[str]) -> str:
     return str(email or "").strip().lower()
@@ -43,18 +84,44 @@ def load_email_list(path: Optional[str]) -> set[str]:
 def load_users(path: Path) -> list[dict]:
     if not path.exists():
         raise FileNotFoundError(f"users file not found: {path}")
-    data = yaml.safe_load(path.read_text()) or []
+    # The loader reads the file handle instead of one decoded string
+    with path.open("rb") as f:
+        data = yaml.load(f, Loader=YamlLoader) or []
     if not isinstance(data, list):
         raise ValueError("users file must be a list")
     return data
 
 
-def ensure_slot(db, slot_id: str):
-    if not slot_id:
-        return
-    if db.get(Slot, slot_id):
-        return
-    db.add(Slot(id=slot_id))
+def upsert_users(db, user_rows: list[dict], update_existing: bool) -> dict:
+    """Insert users (optionally updating existing ones); returns {email: id} of the rows written."""
+    stmt = pg_insert(User).values(user_rows)
+    if update_existing:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[User.email],
+            # Column onupdate defaults don't apply to ON CONFLICT DO UPDATE
+            set_={"role": stmt.excluded.role, "disabled": stmt.excluded.disabled, "updated_at": func.now()},
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=[User.email])
+    return dict(db.execute(stmt.returning(User.email, User.id)).all())
+
+
+def copy_users(db, user_rows: list[dict], update_existing: bool) -> dict:
+    """COPY variant of upsert_users, run on the session's connection and transaction."""
+    with db.connection().connection.cursor() as cur:
+        cur.execute(CREATE_USERS_STAGING_SQL)
+        with cur.copy(COPY_USERS_STAGING_SQL) as copy:
+            for row in user_rows:
+                copy.write_row((row["id"], row["email"], row["role"], row["disabled"]))
+        cur.execute(MERGE_USERS_SQL.format(action=MERGE_USERS_UPDATE if update_existing else "NOTHING"))
+        return dict(cur.fetchall())
+
+
+def copy_user_slots(db, userslot_rows: list[dict]) -> None:
+    with db.connection().connection.cursor() as cur:
+        with cur.copy(COPY_USER_SLOTS_SQL) as copy:
+            for row in userslot_rows:
+                copy.write_row((row["user_id"], row["slot_id"]))
 
 
 def main() -> int:
@@ -80,43 +147,43 @@ def main() -> int:
     allowlist = load_email_list(args.allowlist)
     denylist = load_email_list(args.denylist)
 
-    raw_users = load_users(users_path)
-
     kept = []
     skipped = []
     kept_slots = set()
     skipped_slots = set()
 
-    for entry in raw_users:
-        username = normalize_email(entry.get("username"))
-        google_email = normalize_email(entry.get("google_email"))
-        aliases = [normalize_email(e) for e in (entry.get("google_emails") or [])]
-        aliases = [a for a in aliases if a and a != google_email and a != username]
-
-        primary = google_email or username
-        if not primary or "@" not in primary:
-            slots = parse_allowed_slots(entry.get("allowed_slots") or [])
-            skipped.append((primary or "<missing>", "missing_email", slots))
-            skipped_slots.update(slots)
-            continue
-        if allowlist and primary not in allowlist:
-            slots = parse_allowed_slots(entry.get("allowed_slots") or [])
-            skipped.append((primary, "not_in_allowlist", slots))
-            skipped_slots.update(slots)
-            continue
-        if denylist and primary in denylist:
-            slots = parse_allowed_slots(entry.get("allowed_slots") or [])
-            skipped.append((primary, "in_denylist", slots))
+    # Column-wise filter: the cheap email columns and skip reasons are built
+    # with comprehensions first; per-entry dicts are only built afterwards.
+    entries = load_users(users_path)
+    usernames = [normalize_email(entry.get("username")) for entry in entries]
+    primaries = [
+        normalize_email(entry.get("google_email")) or username
+        for entry, username in zip(entries, usernames)
+    ]
+    reasons = [
+        "missing_email" if "@" not in primary
+        else "not_in_allowlist" if allowlist and primary not in allowlist
+        else "in_denylist" if denylist and primary in denylist
+        else None
+        for primary in primaries
+    ]
+
+    for entry, username, primary, reason in zip(entries, usernames, primaries, reasons):
+        slots = parse_allowed_slots(entry.get("allowed_slots"))
+        if reason:
+            skipped.append((primary or "<missing>", reason, slots))
             skipped_slots.update(slots)
             continue
 
-        slots = parse_allowed_slots(entry.get("allowed_slots") or [])
+        # Aliases are only needed for kept users; normalize inline, dedupe in order
+        excluded = {primary, username, ""}
+        aliases = dict.fromkeys(str(e or "").strip().lower() for e in (entry.get("google_emails") or []))
         kept.append(
             {
                 "email": primary,
                 "role": (entry.get("role") or "client").strip(),
                 "disabled": bool(entry.get("disabled", False)),
-                "aliases": list(dict.fromkeys([a for a in aliases if a and a != primary])),
+                "aliases": [a for a in aliases if a not in excluded],
                 "slots": slots,
             }
         )
@@ -152,6 +219,11 @@ def main() -> int:
         print("Dry-run only. Re-run with --apply to write changes.")
         return 0
 
+    # psycopg 3 has no executemany_mode; batching relies on insertmanyvalues
+    if not engine.dialect.use_insertmanyvalues:
+        raise RuntimeError(f"{engine.dialect.name} dialect does not batch executemany INSERTs")
+    engine.update_execution_options(insertmanyvalues_page_size=INSERT_PAGE_SIZE)
+
     db = SessionLocal()
     try:
         if args.reset:
@@ -161,43 +233,87 @@ def main() -> int:
             db.execute(delete(Slot))
             db.commit()
 
+        # Re-runnable bulk load: don't wait for the WAL flush at commit.
+        # LOCAL scopes the setting to this transaction.
+        db.execute(text("SET LOCAL synchronous_commit = OFF"))
+        if args.reset:
+            # Same transaction as the load, so a failure restores them too
+            for index_name in RESET_REBUILT_INDEXES:
+                db.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+
+        # One upsert for all users. RETURNING yields the id of every inserted
+        # (or, with --update-existing, updated) user; users skipped by
+        # DO NOTHING are absent, so their grants and aliases stay untouched.
+        # Keyed by email: a statement may not touch the same conflict row twice,
+        # and duplicate grants would collide on the PK. Like the old per-row
+        # import, a repeated email updates the user (last entry wins) with
+        # --update-existing and is skipped (first entry wins) without it.
+        kept_by_email = {}
         for item in kept:
-            email = item["email"]
-            role = item["role"] if item["role"] in ("admin", "client") else "client"
-            disabled = item["disabled"]
-            slots = item["slots"]
-
-            user = db.scalar(select(User).where(User.email == email))
-            if user:
-                if not args.update_existing:
-                    continue
-                user.role = role
-                user.disabled = disabled
+            if args.update_existing:
+                kept_by_email[item["email"]] = item
             else:
-                user = User(email=email, role=role, disabled=disabled)
-                db.add(user)
-                db.flush()
-
-            db.execute(delete(UserSlot).where(UserSlot.user_id == user.id))
-            for slot_id in slots:
-                ensure_slot(db, slot_id)
-                db.add(UserSlot(user_id=user.id, slot_id=slot_id))
+                kept_by_email.setdefault(item["email"], item)
+        user_ids = {}
+        if kept_by_email:
+            user_rows = [
+                {
+                    "id": uuid.uuid4(),
+                    "email": item["email"],
+                    "role": item["role"] if item["role"] in ("admin", "client") else "client",
+                    "disabled": item["disabled"],
+                }
+                for item in kept_by_email.values()
+            ]
+            if len(user_rows) > COPY_THRESHOLD:
+                user_ids = copy_users(db, user_rows, args.update_existing)
+            else:
+                user_ids = upsert_users(db, user_rows, args.update_existing)
 
+        userslot_rows = []
+        useremail_rows = []
+        for item in kept_by_email.values():
+            user_id = user_ids.get(item["email"])
+            if user_id is None:
+                continue
+            for slot_id in item["slots"]:
+                userslot_rows.append({"user_id": user_id, "slot_id": slot_id})
             for alias in item["aliases"]:
-                existing_alias = db.scalar(select(UserEmail).where(UserEmail.email == alias))
-                if existing_alias:
-                    continue
-                db.add(UserEmail(user_id=user.id, email=alias, is_primary=False))
+                useremail_rows.append({"user_id": user_id, "email": alias, "is_primary": False})
+
+        # Grants of every written user are replaced wholesale
+        written_ids = list(user_ids.values())
+        for start in range(0, len(written_ids), IN_CLAUSE_CHUNK):
+            chunk = written_ids[start:start + IN_CLAUSE_CHUNK]
+            db.execute(delete(UserSlot).where(UserSlot.user_id.in_(chunk)))
+
+        # One upsert registers every slot referenced by a grant being written
+        ensure_slots(db, (row["slot_id"] for row in userslot_rows))
+        if len(userslot_rows) > COPY_THRESHOLD:
+            copy_user_slots(db, userslot_rows)
+        elif userslot_rows:
+            db.execute(insert(UserSlot), userslot_rows)
+        if useremail_rows:
+            # Aliases already claimed (by anyone) are left as they are
+            db.execute(
+                pg_insert(UserEmail).on_conflict_do_nothing(index_elements=[UserEmail.email]),
+                useremail_rows,
+            )
+
+        if args.reset:
+            for create_sql in RESET_REBUILT_INDEXES.values():
+                db.execute(text(create_sql))
 
         db.commit()
     finally:
         db.close()
 
     if args.prune_slots and slots_to_prune:
-        for slot_id in slots_to_prune:
-            slot_dir = slots_dir / slot_id
-            if slot_dir.exists() and slot_dir.is_dir():
-                shutil.rmtree(slot_dir)
+        targets = [slots_dir / slot_id for slot_id in slots_to_prune]
+        targets = [target for target in targets if target.is_dir()]
+        # Slot trees are independent; overlap the unlink/rmdir syscalls
+        with ThreadPoolExecutor(max_workers=RMTREE_WORKERS) as executor:
+            list(executor.map(shutil.rmtree, targets))
         print(f"Pruned {len(slots_to_prune)} slot directories.")
 
     print("Migration complete.")
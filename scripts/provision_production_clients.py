@@ -1,7 +1,6 @@
 import sys
 import os
 import uuid
-import json
 import logging
 from pathlib import Path
 from datetime import datetime
@@ -10,8 +9,10 @@ from datetime import datetime
 BASE_DIR = Path(__file__).resolve().parent.parent
 sys.path.append(str(BASE_DIR))
 
-from sqlalchemy import select
-from api.db import SessionLocal
+from sqlalchemy import select, tuple_
+from api.crud import get_users_by_email
+from core.json_utils import dump_json
+from api.db import SessionLocal, engine
 from api.models import User, UserSlot, UserEmail, Slot
 
 # Clients to provision
@@ -36,12 +37,40 @@ CLIENTS = [
     }
 ]
 
+# Rows per multi-VALUES statement when SQLAlchemy batches the flushed INSERTs
+INSERT_PAGE_SIZE = 5000
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("Provision")
 
 def provision():
+    # psycopg 3 has no executemany_mode; batching relies on insertmanyvalues
+    if not engine.dialect.use_insertmanyvalues:
+        raise RuntimeError(f"{engine.dialect.name} dialect does not batch executemany INSERTs")
+    engine.update_execution_options(insertmanyvalues_page_size=INSERT_PAGE_SIZE)
+
+    # One timestamp for the whole batch (rows and slot_state.json alike)
+    now = datetime.utcnow()
+    now_iso = now.isoformat()
+
     db = SessionLocal()
     try:
+        # Preload everything that already exists with one IN query per table
+        existing_users = get_users_by_email(db, [c["email"] for c in CLIENTS])
+        existing_slot_ids = set(db.scalars(select(Slot.id).where(Slot.id.in_([c["slot_id"] for c in CLIENTS]))))
+        grant_keys = [(existing_users[c["email"]].id, c["slot_id"]) for c in CLIENTS if c["email"] in existing_users]
+        existing_grants = set()
+        if grant_keys:
+            existing_grants = set(
+                db.execute(
+                    select(UserSlot.user_id, UserSlot.slot_id).where(
+                        tuple_(UserSlot.user_id, UserSlot.slot_id).in_(grant_keys)
+                    )
+                ).tuples()
+            )
+        new_rows = []
+        new_user_slots = []
+
         for client in CLIENTS:
             email = client["email"]
             slot_id = client["slot_id"]
@@ -50,7 +79,7 @@ def provision():
             logger.info(f"Processing {name} ({email})...")
 
             # 1. Create/Get User
-            user = db.scalar(select(User).where(User.email == email))
+            user = existing_users.get(email)
             if not user:
                 logger.info(f"Creating user {email}")
                 user = User(
@@ -59,33 +88,39 @@ def provision():
                     role="client",
                     disabled=False,
                     onboarding_complete=True,
-                    created_at=datetime.utcnow(),
-                    updated_at=datetime.utcnow()
+                    created_at=now,
+                    updated_at=now
                 )
-                db.add(user)
-                db.commit()
+                new_rows.append(user)
+                existing_users[email] = user
             else:
                 logger.info(f"User {email} exists.")
 
             # 2a. Ensure Slot Exists
-            slot = db.scalar(select(Slot).where(Slot.id == slot_id))
-            if not slot:
+            if slot_id not in existing_slot_ids:
                 logger.info(f"Creating slot {slot_id}")
-                slot = Slot(id=slot_id, label=name, created_at=datetime.utcnow(), updated_at=datetime.utcnow())
-                db.add(slot)
-                db.commit()
+                new_rows.append(Slot(id=slot_id, label=name, created_at=now, updated_at=now))
+                existing_slot_ids.add(slot_id)
 
             # 2b. Grant Slot Permission
-            user_slot = db.scalar(select(UserSlot).where(UserSlot.user_id == user.id, UserSlot.slot_id == slot_id))
-            if not user_slot:
+            if (user.id, slot_id) not in existing_grants:
                 logger.info(f"Granting slot {slot_id} to {email}")
-                user_slot = UserSlot(
+                new_user_slots.append(UserSlot(
                     user_id=user.id,
                     slot_id=slot_id,
-                    created_at=datetime.utcnow()
-                )
-                db.add(user_slot)
-                db.commit()
+                    created_at=now
+                ))
+                existing_grants.add((user.id, slot_id))
+
+        # Ids are client-side and the mapper relationships order the INSERTs
+        # (users/slots before grants), so one flush at commit covers everything
+        db.add_all(new_rows + new_user_slots)
+        db.commit()
+
+        # Files only once the rows are committed, so a failed commit leaves
+        # no slot directories behind without matching users/user_slots rows
+        for client in CLIENTS:
+            slot_id = client["slot_id"]
 
             # 3. Create Slot Directory
             slot_dir = BASE_DIR / "slots" / slot_id
@@ -105,22 +140,23 @@ def provision():
                         "min_budget": 0,
                         "location_filter": "Pan India"
                     },
-                    "last_updated": datetime.utcnow().isoformat()
+                    "last_updated": now_iso
                 }
-                state_path.write_text(json.dumps(state, indent=2))
+                state_path.write_bytes(dump_json(state))
             
             # 5. Create config.json (legacy support)
             config_path = slot_dir / "config.json"
             if not config_path.exists():
-                config_path.write_text(json.dumps({
+                config_path.write_bytes(dump_json({
                     "slot_id": slot_id,
                     "refresh_min": 5,
                     "refresh_max": 20
-                }, indent=2))
+                }))
         
         logger.info("✅ All clients provisioned successfully!")
 
     except Exception as e:
+        db.rollback()
         logger.error(f"Failed: {e}")
         import traceback
         traceback.print_exc()
@@ -4,12 +4,26 @@ Simple HTTP server for serving Single Page Applications.
 Serves index.html for all routes (SPA routing).
 """
 import http.server
+import os
 import socketserver
+import threading
+import time
 from pathlib import Path
 
+SENDFILE_CHUNK = 1024 * 1024
+INDEX_RECHECK_SECONDS = 1.0
+
 class SPAHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
     """HTTP request handler that serves index.html for all routes."""
     
+    # index.html answers every SPA route, so it is kept in memory (shared by
+    # all handler threads) and only re-stat'ed every INDEX_RECHECK_SECONDS.
+    _index_lock = threading.Lock()
+    _index_bytes = None
+    _index_etag = None
+    _index_mtime_ns = None
+    _index_checked_at = 0.0
+    
     def end_headers(self):
         # Add CORS headers for local development
         self.send_header('Access-Control-Allow-Origin', '*')
@@ -17,23 +31,85 @@ class SPAHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
         super().end_headers()
     
+    def copyfile(self, source, outputfile):
+        # Let the kernel move file bytes to the socket instead of a Python read/write loop
+        if not hasattr(os, 'sendfile'):
+            return super().copyfile(source, outputfile)
+        try:
+            in_fd = source.fileno()
+            out_fd = outputfile.fileno()
+        except (AttributeError, OSError):
+            return super().copyfile(source, outputfile)
+        offset = 0
+        while True:
+            sent = os.sendfile(out_fd, in_fd, offset, SENDFILE_CHUNK)
+            if sent == 0:
+                break
+            offset += sent
+    
+    def _cached_index(self):
+        """(bytes, etag) of index.html, or None if it is missing."""
+        cls = SPAHTTPRequestHandler
+        now = time.monotonic()
+        with cls._index_lock:
+            if cls._index_bytes is None or now - cls._index_checked_at >= INDEX_RECHECK_SECONDS:
+                index_path = os.path.join(self.directory, 'index.html')
+                try:
+                    st = os.stat(index_path)
+                    if st.st_mtime_ns != cls._index_mtime_ns:
+                        with open(index_path, 'rb') as f:
+                            cls._index_bytes = f.read()
+                        cls._index_etag = f'"{st.st_mtime_ns:x}-{len(cls._index_bytes):x}"'
+                        cls._index_mtime_ns = st.st_mtime_ns
+                except OSError:
+                    cls._index_bytes = cls._index_etag = cls._index_mtime_ns = None
+                    return None
+                cls._index_checked_at = now
+            return cls._index_bytes, cls._index_etag
+    
+    def _send_index(self):
+        cached = self._cached_index()
+        if cached is None:
+            # No index.html: let the stock handler produce the 404
+            self.path = '/index.html'
+            return super().do_GET()
+        body, etag = cached
+        if_none_match = self.headers.get('If-None-Match', '')
+        if etag in (tag.strip() for tag in if_none_match.split(',')):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+    
     def do_GET(self):
         # Serve index.html for root path
-        if self.path == '/':
-            self.path = '/index.html'
+        if self.path in ('/', '/index.html'):
+            return self._send_index()
         
         # If file doesn't exist, serve index.html (SPA routing)
         file_path = Path(self.translate_path(self.path))
         if not file_path.exists() or file_path.is_dir():
-            self.path = '/index.html'
+            return self._send_index()
         
         return super().do_GET()
 
+class SPAServer(socketserver.ThreadingTCPServer):
+    # One thread per connection so parallel asset requests don't queue
+    daemon_threads = True
+    allow_reuse_address = True
+
 if __name__ == '__main__':
     PORT = 5173
     Handler = SPAHTTPRequestHandler
     
-    with socketserver.TCPServer(("0.0.0.0", PORT), Handler) as httpd:
+    with SPAServer(("0.0.0.0", PORT), Handler) as httpd:
         print(f"Serving SPA on http://0.0.0.0:{PORT}")
         print("Press Ctrl+C to stop")
         try:
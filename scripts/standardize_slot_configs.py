@@ -1,22 +1,87 @@
 import os
+import re
 import yaml
-import copy
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 
+try:
+    from yaml import CSafeDumper as YamlDumper, CSafeLoader as YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeDumper as YamlDumper, SafeLoader as YamlLoader
+
 BASE_DIR = Path(os.environ.get("BASE_DIR_ENV") or Path(__file__).resolve().parent.parent)
 SLOTS_DIR = BASE_DIR / "slots"
 SOURCE_SLOT = "slot01"
 TARGET_SLOTS = [f"slot{i:02d}" for i in range(2, 11)]
+MAX_WORKERS = 8
+WAHA_SESSION_LINE = re.compile(r"^whatsapp_waha_session:.*\n", re.MULTILINE)
+# Plain identifier-like values only; anything else goes through the YAML parser
+WAHA_SESSION_PROBE = re.compile(
+    rb"^whatsapp_waha_session:[ \t]*([A-Za-z_][\w.-]*)[ \t]*(?:#.*)?\r?$", re.MULTILINE
+)
+YAML_KEYWORDS = {"true", "false", "yes", "no", "on", "off", "null", "y", "n"}
 
 def load_yaml(path):
     if not path.exists():
         return None
-    with open(path, "r") as f:
-        return yaml.safe_load(f)
+    # libyaml reads the bytes directly (and detects the encoding itself)
+    return yaml.load(path.read_bytes(), Loader=YamlLoader)
+
+def read_waha_session(path):
+    """whatsapp_waha_session of an existing config, or None when absent."""
+    if not path.exists():
+        return None
+    data = path.read_bytes()
+    match = WAHA_SESSION_PROBE.search(data)
+    if match:
+        value = match.group(1).decode("utf-8")
+        if value.lower() not in YAML_KEYWORDS:
+            return value
+    config = yaml.load(data, Loader=YamlLoader)
+    if isinstance(config, dict):
+        return config.get("whatsapp_waha_session")
+    return None
+
+def dump_yaml(data) -> str:
+    return yaml.dump(data, Dumper=YamlDumper, sort_keys=False, default_flow_style=False)
 
-def save_yaml(path, data):
-    with open(path, "w") as f:
-        yaml.dump(data, f, sort_keys=False, default_flow_style=False)
+def render_config(template_text, waha_session):
+    """Template text with its top-level whatsapp_waha_session line replaced (or appended)."""
+    session_line = dump_yaml({"whatsapp_waha_session": waha_session})
+    text, count = WAHA_SESSION_LINE.subn(lambda _: session_line, template_text, count=1)
+    return text if count else template_text + session_line
+
+def process_slot(slot_name, template_text):
+    """Rewrite one target slot's config from the template; returns a status line."""
+    target_dir = SLOTS_DIR / slot_name
+    if not target_dir.exists():
+        return f"⚠️  Skipping {slot_name}: Directory not found"
+        
+    target_path = target_dir / "slot_config.yml"
+    
+    # Read existing unique ID (usually a line probe, no full parse)
+    old_session = read_waha_session(target_path)
+    
+    # Determine strict ID preservation
+    # Default to slot name if missing
+    current_waha_session = slot_name 
+    
+    if old_session is not None:
+        # If the existing session is 'slot01' (the template default), 
+        # we should OVERWRITE it with the actual slot name to ensure uniqueness.
+        # Only keep it if it's something custom (e.g. 'custom_session_id').
+        if old_session == "slot01":
+            current_waha_session = slot_name
+        else:
+            current_waha_session = old_session
+    else:
+         # If missing, default to slot name
+         current_waha_session = slot_name
+        
+    # Create new config from template, restoring the unique ID
+    target_path.write_text(render_config(template_text, current_waha_session))
+    return f"✅ Updated {slot_name} (waha_session: {current_waha_session})"
 
 def main():
     print(f"🔄 Standardizing Slot Configs...")
@@ -38,44 +103,14 @@ def main():
     print(f"   - Countries: {len(source_config.get('country', []))}")
     print(f"   - Max Lead Age: {source_config.get('max_lead_age_seconds')}")
 
-    # 2. Iterate Targets
-    for slot_name in TARGET_SLOTS:
-        target_dir = SLOTS_DIR / slot_name
-        if not target_dir.exists():
-            print(f"⚠️  Skipping {slot_name}: Directory not found")
-            continue
-            
-        target_path = target_dir / "slot_config.yml"
-        
-        # Read existing to get unique ID
-        existing_config = load_yaml(target_path)
-        
-        # Determine strict ID preservation
-        # Default to slot name if missing
-        current_waha_session = slot_name 
-        
-        if existing_config and "whatsapp_waha_session" in existing_config:
-            # If the existing session is 'slot01' (the template default), 
-            # we should OVERWRITE it with the actual slot name to ensure uniqueness.
-            # Only keep it if it's something custom (e.g. 'custom_session_id').
-            old_session = existing_config["whatsapp_waha_session"]
-            if old_session == "slot01":
-                current_waha_session = slot_name
-            else:
-                current_waha_session = old_session
-        else:
-             # If missing, default to slot name
-             current_waha_session = slot_name
-            
-        # Create new config from template
-        new_config = copy.deepcopy(source_config)
-        
-        # Restore unique ID
-        new_config["whatsapp_waha_session"] = current_waha_session
-        
-        # Write
-        save_yaml(target_path, new_config)
-        print(f"✅ Updated {slot_name} (waha_session: {current_waha_session})")
+    # Serialize the template once; each target only swaps its session line
+    template_text = dump_yaml(source_config)
+
+    # 2. Iterate Targets (independent files; messages are printed in slot order)
+    workers = max(1, min(MAX_WORKERS, len(TARGET_SLOTS)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for message in executor.map(partial(process_slot, template_text=template_text), TARGET_SLOTS):
+            print(message)
 
     print("\n✨ Standardization Complete!")
 
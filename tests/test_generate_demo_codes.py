@@ -0,0 +1,61 @@
+import os
+import re
+import secrets
+from itertools import chain
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("dotenv")
+# api.db builds its engine at import time; nothing here connects to it
+os.environ.setdefault("DATABASE_URL", "postgresql+psycopg://localhost/leadforge_test")
+
+from conftest import load_script  # noqa: E402
+
+generate_demo_codes = load_script("generate_demo_codes")
+
+
+def old_generate_code(prefix, length, existing):
+    length = max(6, length)
+    while True:
+        code = secrets.token_hex(length // 2).upper()
+        value = f"{prefix}{code}"
+        if value not in existing:
+            existing.add(value)
+            return value
+
+
+@pytest.mark.parametrize("length", [1, 6, 8, 9, 16])
+def test_codes_have_the_old_shape(length):
+    old = old_generate_code("DEMO-", length, set())
+    new = generate_demo_codes.generate_codes("DEMO-", length, 20, set())
+    shape = re.compile(rf"DEMO-[0-9A-F]{{{len(old) - len('DEMO-')}}}")
+    assert len(new) == 20
+    assert all(shape.fullmatch(code) for code in new)
+
+
+def test_codes_are_unique_and_avoid_existing():
+    existing = {"DEMO-AAAAAAAA"}
+    codes = generate_demo_codes.generate_codes("DEMO-", 8, 500, existing)
+    assert len(set(codes)) == 500
+    assert "DEMO-AAAAAAAA" not in codes
+    # Like the old per-code loop, every generated code is added to `existing`
+    assert existing == {"DEMO-AAAAAAAA", *codes}
+
+
+def test_colliding_codes_are_rerolled(monkeypatch):
+    # Repeated and already-taken values come first, then fresh ones
+    stream = chain(
+        [b"\xaa" * 4, b"\xaa" * 4, b"\xbb" * 4, b"\x01" * 4],
+        (i.to_bytes(4, "big") for i in range(2, 100)),
+    )
+    monkeypatch.setattr(generate_demo_codes.secrets, "token_bytes", lambda n: next(stream))
+    existing = {"X-BBBBBBBB"}
+    codes = generate_demo_codes.generate_codes("X-", 8, 3, existing)
+    assert len(codes) == 3 == len(set(codes))
+    assert "X-BBBBBBBB" not in codes
+    assert {"X-AAAAAAAA", "X-01010101"} <= set(codes)
+
+
+def test_zero_count_returns_nothing():
+    assert generate_demo_codes.generate_codes("DEMO-", 8, 0, set()) == []
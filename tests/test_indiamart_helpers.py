@@ -0,0 +1,168 @@
+"""
+The worker's title/phone/keyword/member-since helpers were rewritten for
+speed. Each test compares the helper with the code it replaced (copied
+below) on representative inputs.
+"""
+import re
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("requests")
+
+from core.workers.indiamart_worker import IndiaMartWorker, _parse_member_months_impl  # noqa: E402
+
+
+@pytest.fixture
+def worker():
+    # The helpers only use class attributes and the pattern cache; skip the
+    # slot/config/session setup of __init__.
+    w = IndiaMartWorker.__new__(IndiaMartWorker)
+    w._terms_pattern_cache = {}
+    return w
+
+
+def old_normalize_title(title):
+    return re.sub(r"[^a-z0-9]+", " ", str(title).lower()).strip()
+
+
+def old_phone_tail_match(lead_phone, verified_phone):
+    clean_lead = "".join(c for c in lead_phone if c.isdigit())
+    clean_verified = "".join(c for c in verified_phone if c.isdigit())
+    if len(clean_lead) >= 10 and len(clean_verified) >= 10:
+        return clean_lead[-10:] == clean_verified[-10:]
+    return False
+
+
+def old_parse_member_months(text, now_year, now_month):
+    # Original body with datetime.now() replaced by now_year/now_month. The
+    # prefix and year-only regexes are kept double-escaped as they were.
+    m = re.search(r"(\d+)\s*(?:months?|mons?)\b", text, re.IGNORECASE)
+    if m:
+        return int(m.group(1))
+    cleaned = re.sub(r"member\\s+since[:\\s]*", "", text, flags=re.IGNORECASE)
+    cleaned = cleaned.replace("since", "").strip(" ,.-")
+    candidates = [
+        "%b %Y", "%B %Y", "%b-%Y", "%B-%Y",
+        "%Y-%m-%d", "%Y-%m", "%Y/%m/%d", "%Y/%m",
+        "%d-%b-%Y", "%d-%B-%Y",
+    ]
+    for fmt in candidates:
+        try:
+            dt = datetime.strptime(cleaned, fmt)
+            return max((now_year - dt.year) * 12 + (now_month - dt.month), 0)
+        except Exception:
+            continue
+    year_match = re.match(r"^(20\\d{2}|19\\d{2})$", cleaned)
+    if year_match:
+        return max((now_year - int(year_match.group(1))) * 12, 0)
+    return 0
+
+
+TITLES = [
+    "",
+    "Steel Pipes",
+    "  Steel   Pipes  ",
+    "MS Steel Pipe - 2\" (50mm), 100 Nos.",
+    "Need: HDPE/PVC pipes!!!",
+    "Café Équipement",
+    "Ölfilter für LKW",
+    "रोलर chain 12B",
+    "İzmir tiles",
+    "\tTabs\nand\rnewlines\t",
+    "UPPER_lower_123",
+    "emoji 🚀 order",
+    None,
+]
+
+
+@pytest.mark.parametrize("title", TITLES)
+def test_normalize_title_matches_old_regex(worker, title):
+    assert worker._normalize_title(title) == old_normalize_title(title or "")
+
+
+PHONE_PAIRS = [
+    ("+91-98765 43210", "9876543210"),
+    ("09876543210", "+91 98765-43210"),
+    ("98765 4321", "9876543210"),
+    ("+1 (415) 555-0100", "4155550100"),
+    ("+91 98765 43211", "9876543210"),
+    ("", "9876543210"),
+    ("abc", "def"),
+]
+
+
+@pytest.mark.parametrize("lead_phone,verified_phone", PHONE_PAIRS)
+def test_phone_tail_matches_old_comparison(worker, lead_phone, verified_phone):
+    lead_tail = worker._phone_tail(lead_phone)
+    new_match = bool(lead_tail) and lead_tail == worker._phone_tail(verified_phone)
+    assert new_match == old_phone_tail_match(lead_phone, verified_phone)
+
+
+TERM_LISTS = [
+    (),
+    ("pipe",),
+    ("pipe", "pipes", "tube"),
+    ("steel pipe", "ss", "s"),
+    ("c++", "(hdpe)", "a.b", "50%"),
+    ("pipe", "pipe"),
+]
+TERM_TITLES = [
+    "",
+    "ms steel pipe - 2\" (50mm)",
+    "need c++ developer",
+    "(hdpe) sheets",
+    "axb rollers",
+    "a.b rollers",
+    "50% discount on tubes",
+    "stainless ss 304",
+    "copper wire",
+]
+
+
+@pytest.mark.parametrize("terms", TERM_LISTS)
+def test_terms_pattern_matches_any_substring(worker, terms):
+    pattern = worker._terms_pattern(terms)
+    for title in TERM_TITLES:
+        expected = any(term in title for term in terms)
+        assert (pattern is not None and bool(pattern.search(title))) == expected, title
+    assert worker._terms_pattern(terms) is pattern
+
+
+MEMBER_SINCE = [
+    "18 months",
+    "3 mons",
+    "1 Month",
+    "Jan 2023",
+    "January 2023",
+    "Jan-2023",
+    "2022-07",
+    "2022-07-15",
+    "2022/07",
+    "2022/07/15",
+    "15-Jan-2023",
+    "since Mar 2020",
+    "Dec 2030",
+    "not a date",
+]
+
+
+@pytest.mark.parametrize("text", MEMBER_SINCE)
+def test_member_months_matches_old_parser(text):
+    assert _parse_member_months_impl(text, 2026, 10) == old_parse_member_months(text, 2026, 10)
+
+
+@pytest.mark.parametrize(
+    "text,months",
+    [
+        ("Member since Jan 2023", 45),
+        ("Member Since: 2022-07", 51),
+        ("member since   Mar-2020", 79),
+        ("2021", 60),
+    ],
+)
+def test_member_months_parses_inputs_the_old_regexes_missed(text, months):
+    # The old double-escaped regexes never stripped "Member since" and never
+    # matched a bare year, so these all came back as 0.
+    assert old_parse_member_months(text, 2026, 10) == 0
+    assert _parse_member_months_impl(text, 2026, 10) == months
@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+from conftest import load_script
+
+migrate = load_script("migrate_jsonl_to_sqlite")
+
+
+def old_row(slot_name, line):
+    """Row the original per-line loop inserted, or None if it skipped the line."""
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        lead = json.loads(line)
+    except json.JSONDecodeError:
+        return None
+    lead_id = lead.get("lead_id") or lead.get("id")
+    if not lead_id:
+        return None
+    return (
+        lead_id, slot_name, lead.get("title"), lead.get("url") or lead.get("detail_url"),
+        lead.get("country"), lead.get("status", "captured"),
+        lead.get("fetched_at"), lead.get("clicked_at"), json.dumps(lead),
+    )
+
+
+LINES = [
+    '{"lead_id": "123", "title": "Steel Pipes", "url": "https://x/1", "country": "IN", '
+    '"status": "clicked", "fetched_at": "2026-01-01T00:00:00Z", "clicked_at": "2026-01-01T00:01:00Z"}\n',
+    '{"id": "456", "detail_url": "https://x/2", "title": "Caf\\u00e9 équipement"}\n',
+    '{"lead_id": "", "id": "789", "extra": {"nested": [1, 2, 3]}}',
+    '  {"lead_id": 42}  \n',
+    '{"title": "no id"}\n',
+    "\n",
+    "   ",
+    "{not json",
+]
+
+
+@pytest.mark.parametrize("line", LINES)
+def test_parse_lead_line_matches_old_loop(line):
+    old = old_row("slot01", line)
+    new = migrate.parse_lead_line("slot01", line)
+    if old is None:
+        assert new is None
+        return
+    assert new[:-1] == old[:-1]
+    # raw_data is now the original line rather than a re-serialization
+    assert json.loads(new[-1]) == json.loads(old[-1])
+
+
+@pytest.mark.parametrize("line", ["[1, 2]", '"text"', "3", "null"])
+def test_parse_lead_line_skips_non_object_records(line):
+    # The old loop raised AttributeError here and aborted the whole slot
+    assert migrate.parse_lead_line("slot01", line) is None